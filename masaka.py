@@ -3,11 +3,259 @@ import os
 import sys
 import venv
 import ctypes
+import time
+import argparse
+import tempfile
+import hashlib
+import json
+import shutil
+import filecmp
+import platform
+import ast
+import functools
+import contextlib
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import urllib.request
+import re
+
+GENERATOR_VERSION = '2'
+MANIFEST_FILE_NAME = '.scaffold_manifest.json'
+DEFAULT_REQUIREMENTS = ['django', 'psycopg2']
+# Versions installed for the requirements the scaffolder adds. Pins are part of the wheel
+# cache key, so a key names the same wheels whichever machine populated it first.
+REQUIREMENT_PINS = {
+    'django': '5.2.18',
+    'psycopg2': '2.9.13',
+    'psycopg': '3.3.6',
+    'redis': '8.1.0',
+    'uvicorn': '0.54.0',
+    'uvicorn-worker': '0.4.0',
+    'gunicorn': '26.2.0',
+    'whitenoise': '6.12.0',
+    'httpx': '0.28.1',
+    'argon2-cffi': '25.1.0',
+    'bcrypt': '5.0.0',
+}
+DEFAULT_PROJECTS_ROOT = os.path.join(os.path.expanduser("~"), 'DjangoProjects')
+DEFAULT_CACHE_ROOT = os.path.join(DEFAULT_PROJECTS_ROOT, '.scaffold_cache')
+TEMPLATE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scaffold_templates')
+BOOTSTRAP_CSS_URL = 'https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css'
+
+# Helper script written into each project and run with the virtualenv's interpreter.
+# It renders the startproject/startapp templates for every app in one Python process
+# (or a pool of WORKERS processes) instead of paying one interpreter start per app.
+APP_GENERATOR_SCRIPT = """
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management import call_command
+
+
+def startapp(app):
+    started = time.perf_counter()
+    if not os.path.exists(app):
+        call_command('startapp', app)
+    return app, time.perf_counter() - started
+
+
+def main():
+    started = time.perf_counter()
+    if not os.path.exists('manage.py'):
+        call_command('startproject', PROJECT_NAME, '.')
+    if WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=WORKERS) as pool:
+            timings = list(pool.map(startapp, APPS))
+    else:
+        timings = [startapp(app) for app in APPS]
+    for app, elapsed in timings:
+        print(f"  {app}: {elapsed * 1000:.1f} ms")
+    print(f"Generated {len(APPS)} apps in {time.perf_counter() - started:.2f}s with {WORKERS} worker(s).")
+
+
+if __name__ == '__main__':
+    main()
+"""
+
+# Helper script that runs the whole migration stage inside one long-lived Django process.
+# Only the scaffolded APPS are considered: apps without model changes are not passed to
+# makemigrations, freshly scaffolded apps can have their migrations squashed, and a single
+# migrate applies everything that is pending while timing each app.
+MIGRATION_RUNNER_SCRIPT = """
+import os
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', SETTINGS_MODULE)
+
+import django
+
+django.setup()
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.commands.migrate import Command as MigrateCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.questioner import NonInteractiveMigrationQuestioner
+from django.db.migrations.state import ProjectState
+
+
+class TimedMigrate(MigrateCommand):
+    # migrate hands this callback to its MigrationExecutor; time spent per app is summed
+    # from apply_start/apply_success instead of running one migrate per app
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.app_timings = {}
+        self.applying = None
+
+    def migration_progress_callback(self, action, migration=None, fake=False):
+        if action == 'apply_start':
+            self.applying = time.perf_counter()
+        elif action == 'apply_success':
+            elapsed = time.perf_counter() - self.applying
+            self.app_timings[migration.app_label] = self.app_timings.get(migration.app_label, 0) + elapsed
+
+
+def local_app_labels():
+    # The apps the scaffolder generated; third-party and contrib apps are never touched
+    return [config.label for config in apps.get_app_configs() if config.name in APPS]
+
+
+def changed_app_labels(app_labels):
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    questioner = NonInteractiveMigrationQuestioner(specified_apps=set(app_labels), dry_run=True)
+    autodetector = MigrationAutodetector(loader.project_state(), ProjectState.from_apps(apps), questioner)
+    changes = autodetector.changes(graph=loader.graph, trim_to_apps=set(app_labels))
+    return [label for label in app_labels if label in changes]
+
+
+def squash_fresh_apps(app_labels):
+    # Only apps whose migrations were never applied are safe to squash
+    connection = connections[DEFAULT_DB_ALIAS]
+    loader = MigrationLoader(connection)
+    squashed = []
+    for label in app_labels:
+        names = sorted(name for app_label, name in loader.disk_migrations if app_label == label)
+        applied = [key for key in loader.applied_migrations if key[0] == label]
+        if len(names) > 1 and not applied and not any('_squashed_' in name for name in names):
+            call_command('squashmigrations', label, names[-1], interactive=False, verbosity=0)
+            squashed.append(label)
+    return squashed
+
+
+def has_pending_migrations():
+    executor = MigrationExecutor(connections[DEFAULT_DB_ALIAS])
+    return bool(executor.migration_plan(executor.loader.graph.leaf_nodes()))
+
+
+def main():
+    started = time.perf_counter()
+    app_labels = local_app_labels()
+
+    changed = changed_app_labels(app_labels)
+    if changed:
+        phase_started = time.perf_counter()
+        call_command('makemigrations', *changed, interactive=False, verbosity=0)
+        print(f"makemigrations for {', '.join(changed)}: {time.perf_counter() - phase_started:.2f}s")
+    unchanged = [label for label in app_labels if label not in changed]
+    if unchanged:
+        print(f"No model changes in {len(unchanged)} app(s), skipped makemigrations for them.")
+
+    if SQUASH:
+        squashed = squash_fresh_apps(app_labels)
+        if squashed:
+            print(f"Squashed migrations for {', '.join(squashed)}.")
+
+    if has_pending_migrations():
+        phase_started = time.perf_counter()
+        command = TimedMigrate()
+        call_command(command, interactive=False, verbosity=0)
+        for label, elapsed in command.app_timings.items():
+            print(f"  migrate {label}: {elapsed * 1000:.1f} ms")
+        print(f"migrate: {time.perf_counter() - phase_started:.2f}s")
+    else:
+        print("No unapplied migrations.")
+    print(f"Migration stage finished in {time.perf_counter() - started:.2f}s.")
+
+
+if __name__ == '__main__':
+    main()
+"""
+
+class ScaffoldTracer:
+    # Collects per-phase spans, subprocess durations and generated bytes for one run;
+    # summary() is what --trace-json exports
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []
+        self.subprocesses = []
+        self.files_written = 0
+        self.bytes_written = 0
+        self.stack = []
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        parent = self.stack[-1] if self.stack else None
+        self.stack.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stack.pop()
+            self.spans.append({'name': name, 'parent': parent, 'start': round(started - self.started, 6),
+                               'duration': round(time.perf_counter() - started, 6), **attributes})
+
+    def record_subprocess(self, command, duration, returncode):
+        if not isinstance(command, str):
+            command = ' '.join(str(part) for part in command)
+        self.subprocesses.append({'command': command, 'duration': round(duration, 6), 'returncode': returncode,
+                                  'phase': self.stack[-1] if self.stack else None})
+
+    def record_write(self, file_path, size):
+        self.files_written += 1
+        self.bytes_written += size
+
+    def summary(self):
+        return {
+            'total_duration': round(time.perf_counter() - self.started, 6),
+            'spans': self.spans,
+            'subprocesses': self.subprocesses,
+            'files_written': self.files_written,
+            'bytes_written': self.bytes_written,
+        }
 
-def run_batch_script_and_wait(script_path):
-    # Run the batch script and wait for it to complete
-    process = subprocess.Popen(script_path, shell=True)
-    process.wait()
+    def export_json(self, output_path):
+        with open(output_path, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def print_summary(self):
+        print("Phase timings:")
+        for span in sorted(self.spans, key=lambda span: span['start']):
+            indent = '    ' if span['parent'] else '  '
+            print(f"{indent}{span['name']}: {span['duration'] * 1000:.1f} ms")
+        subprocess_time = sum(entry['duration'] for entry in self.subprocesses)
+        print(f"  {len(self.subprocesses)} subprocess(es) took {subprocess_time:.2f}s; "
+              f"{self.files_written} file(s), {self.bytes_written} bytes written")
+
+TRACER = ScaffoldTracer()
+
+def run_traced(command, **kwargs):
+    # subprocess.run that records the command's duration on the tracer
+    started = time.perf_counter()
+    returncode = None
+    try:
+        result = subprocess.run(command, **kwargs)
+        returncode = result.returncode
+        return result
+    except subprocess.CalledProcessError as e:
+        returncode = e.returncode
+        raise
+    finally:
+        TRACER.record_subprocess(command, time.perf_counter() - started, returncode)
 
 def create_virtual_env(env_path):
     if not os.path.exists(env_path):
@@ -17,44 +265,893 @@ def create_virtual_env(env_path):
     else:
         print("Virtual environment already exists.")
 
-def create_setup_script(env_path, project_path, project_name, apps):
-    activate_script = os.path.join(env_path, "Scripts", "activate.bat") if os.name == 'nt' else os.path.join(env_path, "bin", "activate")
-    setup_script_path = os.path.join(project_path, "setup_django.bat")
-
-    with open(setup_script_path, 'w') as file:
-        file.write(f'@echo off\n')
-        file.write(f'cd /d "{project_path}"\n')
-        file.write(f'call "{activate_script}"\n')
-        file.write(f'pip install django\n')
-        file.write(f'pip install psycopg2\n')  # Install psycopg2
-        file.write(f'django-admin startproject {project_name} .\n')
-
+def get_env_python(env_path):
+    return os.path.join(env_path, "Scripts", "python.exe") if os.name == 'nt' else os.path.join(env_path, "bin", "python")
+
+def write_app_generator_script(project_path, project_name, apps, workers=1):
+    script_path = os.path.join(project_path, "generate_apps.py")
+    with open(script_path, 'w') as file:
+        file.write(f'PROJECT_NAME = {project_name!r}\n')
+        file.write(f'APPS = {list(apps)!r}\n')
+        file.write(f'WORKERS = {max(1, int(workers))}\n')
+        file.write(APP_GENERATOR_SCRIPT)
+    return script_path
+
+def write_migration_runner_script(project_path, project_name, apps, squash=False):
+    script_path = os.path.join(project_path, "run_migrations.py")
+    with open(script_path, 'w') as file:
+        file.write(f'SETTINGS_MODULE = {project_name + ".settings"!r}\n')
+        file.write(f'APPS = {list(apps)!r}\n')
+        file.write(f'SQUASH = {bool(squash)!r}\n')
+        file.write(MIGRATION_RUNNER_SCRIPT)
+    return script_path
+
+def requirement_name(requirement):
+    return re.split(r'[\[=<>!~;@ ]', requirement, maxsplit=1)[0].lower()
+
+def pin_requirements(requirements):
+    # 'psycopg[binary]' becomes 'psycopg[binary]==3.3.6'; anything with its own version
+    # specifier, or not in REQUIREMENT_PINS, is left as given
+    pinned = []
+    for requirement in requirements:
+        name = requirement_name(requirement)
+        if re.fullmatch(r'[A-Za-z0-9_.-]+(\[[^\]]*\])?', requirement) and name in REQUIREMENT_PINS:
+            requirement = f'{requirement}=={REQUIREMENT_PINS[name]}'
+        pinned.append(requirement)
+    return pinned
+
+class WheelCache:
+    # Content-addressed wheelhouse shared by every scaffolded project. The key covers the
+    # interpreter, the platform and the pinned requirement list, so a project with the same
+    # inputs installs from local wheels with --no-index and never touches the network again.
+    def __init__(self, requirements, cache_root=None):
+        self.requirements = sorted(set(pin_requirements(requirements)))
+        self.cache_root = cache_root or DEFAULT_CACHE_ROOT
+        self.key = self.compute_key()
+        self.wheelhouse = os.path.join(self.cache_root, 'wheels', self.key)
+
+    def compute_key(self):
+        key_source = json.dumps({
+            'python': f'{sys.implementation.name}-{sys.version_info.major}.{sys.version_info.minor}',
+            'platform': f'{sys.platform}-{platform.machine()}',
+            'requirements': self.requirements,
+        }, sort_keys=True)
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:16]
+
+    def is_populated(self):
+        return os.path.exists(os.path.join(self.wheelhouse, '.complete'))
+
+    def populate(self, python):
+        # Build into a private directory and rename it into place so concurrent
+        # scaffolds never see a half-filled wheelhouse
+        staging_path = f'{self.wheelhouse}.tmp-{os.getpid()}'
+        os.makedirs(staging_path, exist_ok=True)
+        print(f"Building wheel cache {self.key} for: {', '.join(self.requirements)}")
+        try:
+            run_traced([python, '-m', 'pip', 'wheel', '--wheel-dir', staging_path] + self.requirements, check=True)
+            # Record the resolved wheels too, dependencies included
+            wheels = sorted(name for name in os.listdir(staging_path) if name.endswith('.whl'))
+            with open(os.path.join(staging_path, '.complete'), 'w') as file:
+                file.write('\n'.join(self.requirements + [''] + wheels) + '\n')
+            os.replace(staging_path, self.wheelhouse)
+        except OSError:
+            # Another scaffold published the same key first
+            if not self.is_populated():
+                raise
+        finally:
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+    def ensure(self, python):
+        if self.is_populated():
+            print(f"Using cached wheels from {self.wheelhouse}")
+        else:
+            os.makedirs(os.path.dirname(self.wheelhouse), exist_ok=True)
+            self.populate(python)
+        return self.wheelhouse
+
+    def install_command(self, python):
+        return [python, '-m', 'pip', 'install', '--no-index', '--find-links', self.wheelhouse] + self.requirements
+
+class SharedEnvironment:
+    # One virtualenv per requirement set, keyed like the wheel cache. Batch scaffolds install
+    # into it once and every project links to it instead of building its own.
+    def __init__(self, requirements, cache_root=None, use_wheel_cache=True):
+        self.wheel_cache = WheelCache(requirements, cache_root)
+        self.use_wheel_cache = use_wheel_cache
+        self.env_path = os.path.join(self.wheel_cache.cache_root, 'envs', self.wheel_cache.key)
+        self.python = get_env_python(self.env_path)
+
+    def is_ready(self):
+        return os.path.exists(os.path.join(self.env_path, '.complete'))
+
+    def ensure(self):
+        if self.is_ready():
+            print(f"Using shared environment {self.env_path}")
+            return self.env_path
+        create_virtual_env(self.env_path)
+        requirements = self.wheel_cache.requirements
+        if self.use_wheel_cache:
+            self.wheel_cache.ensure(self.python)
+            run_traced(self.wheel_cache.install_command(self.python), check=True)
+        else:
+            run_traced([self.python, '-m', 'pip', 'install'] + requirements, check=True)
+        with open(os.path.join(self.env_path, '.complete'), 'w') as file:
+            file.write('\n'.join(requirements) + '\n')
+        return self.env_path
+
+def link_shared_env(project_path, env_path):
+    # Keep the usual project/env layout so the launch commands still work
+    link_path = os.path.join(project_path, 'env')
+    if os.path.lexists(link_path):
+        return
+    try:
+        os.symlink(env_path, link_path, target_is_directory=True)
+    except OSError:
+        print(f"Could not link {link_path}; the project uses the shared environment at {env_path}")
+
+def generate_project_in_process(project_path, project_name, apps):
+    # Batch workers run inside the shared environment, so Django is imported once per
+    # worker and reused for every project it scaffolds
+    from django.core.management import call_command
+    if not os.path.exists(os.path.join(project_path, 'manage.py')):
+        call_command('startproject', project_name, project_path)
+    for app in apps:
+        app_path = os.path.join(project_path, app)
+        if not os.path.exists(app_path):
+            os.makedirs(app_path)
+            call_command('startapp', app, app_path)
+    print(f"Generated {len(apps)} apps in the worker's interpreter.")
+
+def compare_app_generation(env_path, project_name, apps, workers=1):
+    # Scaffold the same apps twice in scratch directories, once with one subprocess
+    # per app (the original setup script behaviour) and once in-process, and report both.
+    python = get_env_python(env_path)
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as scratch:
+        subprocess_path = os.path.join(scratch, 'subprocess')
+        os.makedirs(subprocess_path)
+        started = time.perf_counter()
+        subprocess.run([python, '-m', 'django', 'startproject', project_name, '.'], cwd=subprocess_path, check=True)
         for app in apps:
-            file.write(f'django-admin startapp {app}\n')
+            subprocess.run([python, '-m', 'django', 'startapp', app], cwd=subprocess_path, check=True)
+        timings['subprocess'] = time.perf_counter() - started
+
+        inprocess_path = os.path.join(scratch, 'inprocess')
+        os.makedirs(inprocess_path)
+        script_path = write_app_generator_script(inprocess_path, project_name, apps, workers)
+        started = time.perf_counter()
+        subprocess.run([python, script_path], cwd=inprocess_path, check=True, stdout=subprocess.DEVNULL)
+        timings['inprocess'] = time.perf_counter() - started
+
+    print(f"App generation timing for {len(apps)} apps:")
+    print(f"  per-app subprocess mode: {timings['subprocess']:.2f}s")
+    print(f"  in-process mode ({workers} worker(s)): {timings['inprocess']:.2f}s")
+    if timings['inprocess'] > 0:
+        print(f"  speedup: {timings['subprocess'] / timings['inprocess']:.1f}x")
+    return timings
+
+class PythonExpression:
+    # Wraps source code that should be emitted verbatim by format_python_value
+    def __init__(self, code):
+        self.code = code
+
+    def __repr__(self):
+        return self.code
+
+def format_python_value(value, indent=0):
+    # Render dicts/lists/tuples as indented Python literals, one item per line
+    pad = '    ' * (indent + 1)
+    closing = '    ' * indent
+    if isinstance(value, dict):
+        if not value:
+            return '{}'
+        items = ''.join(f"{pad}{key!r}: {format_python_value(item, indent + 1)},\n" for key, item in value.items())
+        return '{\n' + items + closing + '}'
+    if isinstance(value, (list, tuple)):
+        opening, end = ('[', ']') if isinstance(value, list) else ('(', ')')
+        if not value:
+            return opening + end
+        items = ''.join(f"{pad}{format_python_value(item, indent + 1)},\n" for item in value)
+        return opening + '\n' + items + closing + end
+    return repr(value)
+
+class PythonSourceEditor:
+    # Parses a module once, collects edits to its top-level assignments and imports, and
+    # writes the result in a single pass. Assignments are located by their AST line span,
+    # so the edit does not depend on how the original file happens to be formatted.
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, 'r') as file:
+            self.source = file.read()
+        self.lines = self.source.splitlines(keepends=True)
+        if self.lines and not self.lines[-1].endswith('\n'):
+            self.lines[-1] += '\n'
+        tree = ast.parse(self.source)
+        self.assignments = {}
+        self.existing_imports = set()
+        self.import_end_line = 0
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                self.assignments[node.targets[0].id] = node
+            elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+                self.assignments[node.target.id] = node
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
+                self.existing_imports.add(ast.unparse(node))
+                self.import_end_line = node.end_lineno
+        self.replacements = {}
+        self.new_imports = []
+        self.appended = []
+
+    def source_segment(self, node):
+        # ast.get_source_segment re-splits the whole source on every call, which makes
+        # long lists quadratic; slice the lines split once in __init__ instead
+        first, last = node.lineno - 1, node.end_lineno - 1
+        if first == last:
+            return self.lines[first].encode('utf-8')[node.col_offset:node.end_col_offset].decode('utf-8')
+        return (self.lines[first].encode('utf-8')[node.col_offset:].decode('utf-8')
+                + ''.join(self.lines[first + 1:last])
+                + self.lines[last].encode('utf-8')[:node.end_col_offset].decode('utf-8'))
+
+    def has(self, name):
+        return name in self.assignments
+
+    def literal(self, name, default=None):
+        node = self.assignments.get(name)
+        if node is None:
+            return default
+        try:
+            return ast.literal_eval(node.value)
+        except ValueError:
+            return default
+
+    def set_assignment(self, name, code):
+        code = code if code.endswith('\n') else code + '\n'
+        node = self.assignments.get(name)
+        if node is None:
+            self.appended.append(code)
+        else:
+            self.replacements[node.lineno - 1] = (node.end_lineno, code)
+
+    def set_value(self, name, value):
+        self.set_assignment(name, f"{name} = {format_python_value(value)}")
+
+    def remove(self, name):
+        node = self.assignments.get(name)
+        if node is not None:
+            self.replacements[node.lineno - 1] = (node.end_lineno, '')
+
+    def extend_list(self, name, items, after=None, before=None):
+        # Append item expressions to a list assignment, skipping any already present.
+        # With after or before, the items are placed next to that existing element instead.
+        node = self.assignments.get(name)
+        if node is not None and isinstance(node.value, ast.List):
+            existing = [self.source_segment(element) for element in node.value.elts]
+            keys = [ast.unparse(element) for element in node.value.elts]
+        else:
+            existing, keys = [], []
+        seen = set(keys)
+        added = []
+        for item in items:
+            key = ast.unparse(ast.parse(item, mode='eval').body)
+            if key not in seen:
+                seen.add(key)
+                added.append(item)
+        if added or node is None:
+            position = len(existing)
+            if after is not None:
+                after_key = ast.unparse(ast.parse(after, mode='eval').body)
+                if after_key in keys:
+                    position = keys.index(after_key) + 1
+            elif before is not None:
+                before_key = ast.unparse(ast.parse(before, mode='eval').body)
+                if before_key in keys:
+                    position = keys.index(before_key)
+            elements = existing[:position] + added + existing[position:]
+            body = ''.join(f"    {element},\n" for element in elements)
+            self.set_assignment(name, f"{name} = [\n{body}]")
+        return added
+
+    def replace_list_items(self, name, items, key):
+        # Like extend_list, but an item whose key(element) matches an existing element
+        # replaces that element in place instead of being added next to it
+        node = self.assignments.get(name)
+        if node is not None and isinstance(node.value, ast.List):
+            elements = [self.source_segment(element) for element in node.value.elts]
+            positions = {key(element): index for index, element in enumerate(node.value.elts)}
+        else:
+            elements, positions = [], {}
+        changed = node is None
+        for item in items:
+            item_key = key(ast.parse(item, mode='eval').body)
+            index = positions.get(item_key)
+            if index is None:
+                positions[item_key] = len(elements)
+                elements.append(item)
+                changed = True
+            elif ast.unparse(ast.parse(elements[index], mode='eval')) != ast.unparse(ast.parse(item, mode='eval')):
+                elements[index] = item
+                changed = True
+        if changed:
+            body = ''.join(f"    {element},\n" for element in elements)
+            self.set_assignment(name, f"{name} = [\n{body}]")
+        return changed
+
+    def add_import(self, line):
+        key = ast.unparse(ast.parse(line).body[0])
+        if key not in self.existing_imports:
+            self.existing_imports.add(key)
+            self.new_imports.append(line if line.endswith('\n') else line + '\n')
+
+    def append(self, code):
+        self.appended.append(code if code.endswith('\n') else code + '\n')
+
+    def render(self):
+        output = []
+        index = 0
+        while index < len(self.lines):
+            if index == self.import_end_line and self.new_imports:
+                output.extend(self.new_imports)
+            if index in self.replacements:
+                end_line, code = self.replacements[index]
+                output.append(code)
+                index = end_line
+            else:
+                output.append(self.lines[index])
+                index += 1
+        if self.import_end_line >= len(self.lines) and self.new_imports:
+            output.extend(self.new_imports)
+        if self.appended:
+            output.append('\n')
+            output.extend(self.appended)
+        return ''.join(output)
+
+    def save(self):
+        content = self.render()
+        with open(self.file_path, 'w') as file:
+            file.write(content)
+        TRACER.record_write(self.file_path, len(content.encode('utf-8')))
+        return content
+
+# Router written into the project package when read replicas are configured
+DATABASE_ROUTER_TEMPLATE = """import random
+
+REPLICAS = {replicas!r}
+
+
+class PrimaryReplicaRouter:
+    # Reads are spread over the replicas, writes and migrations go to the primary
+    def db_for_read(self, model, **hints):
+        return random.choice(REPLICAS) if REPLICAS else 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
+"""
+
+class DatabaseProfile:
+    # Database settings tuned for production: persistent connections with health checks,
+    # pgbouncer-safe cursor handling, psycopg 3 connection pooling and read replicas
+    def __init__(self, engine='django.db.backends.postgresql', name='', user='', password=None, host='localhost',
+                 port='5432', conn_max_age=600, conn_health_checks=True, pgbouncer=False,
+                 server_side_cursors=True, replicas=None, driver='psycopg', pool=False, pool_size=10):
+        self.engine = engine
+        self.name = name
+        self.user = user
+        self.password = password
+        self.host = host
+        self.port = port
+        self.conn_max_age = conn_max_age
+        self.conn_health_checks = conn_health_checks
+        self.pgbouncer = pgbouncer
+        self.server_side_cursors = server_side_cursors
+        self.replicas = replicas or []
+        self.driver = driver
+        self.pool = pool
+        self.pool_size = pool_size
+
+    @classmethod
+    def sqlite(cls, replicas=0):
+        # Local stand-in: every replica alias points at the same database file
+        return cls(engine='django.db.backends.sqlite3', name=PythonExpression("BASE_DIR / 'db.sqlite3'"),
+                   host='', port='', replicas=[''] * replicas)
+
+    def is_postgres(self):
+        return self.engine == 'django.db.backends.postgresql'
+
+    def connection_settings(self, host):
+        settings = {'ENGINE': self.engine, 'NAME': self.name}
+        if self.is_postgres():
+            settings['USER'] = self.user
+            # Keep credentials out of the generated file unless given explicitly
+            settings['PASSWORD'] = self.password if self.password is not None else PythonExpression("os.environ.get('DATABASE_PASSWORD', '')")
+            settings['HOST'] = host
+            settings['PORT'] = self.port
+        # psycopg's pool manages connection reuse itself and Django refuses CONN_MAX_AGE with it
+        settings['CONN_MAX_AGE'] = 0 if self.uses_pool() else self.conn_max_age
+        settings['CONN_HEALTH_CHECKS'] = self.conn_health_checks
+        if self.is_postgres() and (self.pgbouncer or not self.server_side_cursors):
+            # Server-side cursors do not survive pgbouncer transaction pooling
+            settings['DISABLE_SERVER_SIDE_CURSORS'] = True
+        if self.uses_pool():
+            settings['OPTIONS'] = {'pool': {'min_size': 2, 'max_size': self.pool_size}}
+        return settings
+
+    def uses_pool(self):
+        # An application-side pool in front of pgbouncer would just pool twice
+        return self.is_postgres() and self.driver == 'psycopg' and self.pool and not self.pgbouncer
+
+    def replica_aliases(self):
+        return [f'replica_{index}' for index in range(1, len(self.replicas) + 1)]
+
+    def databases(self):
+        databases = {'default': self.connection_settings(self.host)}
+        for alias, host in zip(self.replica_aliases(), self.replicas):
+            replica = self.connection_settings(host or self.host)
+            replica['TEST'] = {'MIRROR': 'default'}
+            databases[alias] = replica
+        return databases
+
+    def requirements(self):
+        if not self.is_postgres():
+            return []
+        if self.driver == 'psycopg2':
+            return ['psycopg2']
+        return ['psycopg[binary,pool]'] if self.uses_pool() else ['psycopg[binary]']
+
+    def router_content(self):
+        return DATABASE_ROUTER_TEMPLATE.format(replicas=self.replica_aliases())
+
+# Views generated for an auth app and the templates they render, below <app_label>/
+AUTH_APP_VIEWS = {
+    'register': 'register.html',
+    'user_login': 'login.html',
+    'user_logout': 'logout.html',
+    'home': 'home.html',
+}
+
+# Model given to CRUD apps whose spec declares none
+CRUD_DEFAULT_MODEL = {
+    'name': 'Item',
+    'fields': [
+        {'name': 'name', 'type': 'CharField', 'max_length': 200},
+        {'name': 'status', 'type': 'CharField', 'max_length': 20, 'default': 'open', 'db_index': True},
+        {'name': 'notes', 'type': 'TextField', 'blank': True},
+        {'name': 'created_at', 'type': 'DateTimeField', 'auto_now_add': True},
+        {'name': 'updated_at', 'type': 'DateTimeField', 'auto_now': True},
+    ],
+    'str_field': 'name',
+}
+
+# CRUD endpoints generated per model: view suffix -> route below '<app>/<model>s/'
+CRUD_VIEWS = {
+    'list': '',
+    'detail': '<int:pk>/',
+    'bulk_create': 'bulk-create/',
+    'bulk_update': 'bulk-update/',
+    'export': 'export/',
+}
+CRUD_WRITE_VIEWS = ('bulk_create', 'bulk_update')
+
+# Multi-worker ASGI server entry point written into the project root
+ASGI_SERVER_TEMPLATE = """import os
+
+import uvicorn
+
+if __name__ == '__main__':
+    workers = int(os.environ.get('WEB_CONCURRENCY', {workers}))
+    uvicorn.run(
+        '{project_name}.asgi:application',
+        host=os.environ.get('HOST', '{host}'),
+        port=int(os.environ.get('PORT', {port})),
+        workers=workers,
+        lifespan='off',
+        proxy_headers=True,
+    )
+"""
+
+class CacheProfile:
+    # CACHES setting for the generated project. The redis backend falls back to a
+    # local-memory cache when REDIS_URL is not set, so scaffolds run without a server.
+    def __init__(self, backend='locmem', location=None, timeout=300, view_timeout=60):
+        self.backend = backend
+        self.location = location
+        self.timeout = timeout
+        self.view_timeout = view_timeout
+
+    def caches(self, project_name):
+        if self.backend == 'redis':
+            default = {
+                'BACKEND': PythonExpression("'django.core.cache.backends.redis.RedisCache' if os.environ.get('REDIS_URL') "
+                                            "else 'django.core.cache.backends.locmem.LocMemCache'"),
+                'LOCATION': PythonExpression(f"os.environ.get('REDIS_URL', {project_name!r})"),
+            }
+        elif self.backend == 'file':
+            default = {
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': self.location or PythonExpression("BASE_DIR / 'cache'"),
+            }
+        else:
+            default = {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                'LOCATION': self.location or project_name,
+            }
+        default['TIMEOUT'] = self.timeout
+        default['KEY_PREFIX'] = project_name
+        return {'default': default}
+
+    def requirements(self):
+        return ['redis'] if self.backend == 'redis' else []
+
+class AuthProfile:
+    # Session storage, password hashing and login throttling for the generated auth flow.
+    # cache and cached_db sessions keep logins off the sessions table (cached_db still
+    # writes through), signed_cookies needs no server-side storage at all. Failed logins
+    # are counted in the cache per address and per username.
+    SESSION_ENGINES = {
+        'db': 'django.contrib.sessions.backends.db',
+        'cache': 'django.contrib.sessions.backends.cache',
+        'cached_db': 'django.contrib.sessions.backends.cached_db',
+        'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    }
+    HASHER_PROFILES = {
+        'default': None,
+        'argon2': ['Argon2PasswordHasher', 'PBKDF2PasswordHasher', 'PBKDF2SHA1PasswordHasher',
+                   'BCryptSHA256PasswordHasher', 'ScryptPasswordHasher'],
+        'bcrypt': ['BCryptSHA256PasswordHasher', 'PBKDF2PasswordHasher', 'PBKDF2SHA1PasswordHasher',
+                   'Argon2PasswordHasher', 'ScryptPasswordHasher'],
+        'scrypt': ['ScryptPasswordHasher', 'PBKDF2PasswordHasher', 'PBKDF2SHA1PasswordHasher',
+                   'Argon2PasswordHasher', 'BCryptSHA256PasswordHasher'],
+        # Deliberately weak, only ever written to the test settings
+        'fast': ['MD5PasswordHasher'],
+    }
+
+    def __init__(self, session='db', hashers='default', login_attempts=0, login_window=300,
+                 test_settings=False):
+        self.session = session
+        self.hashers = hashers
+        self.login_attempts = login_attempts
+        self.login_window = login_window
+        self.test_settings = test_settings
+
+    def password_hashers(self, profile):
+        return [f'django.contrib.auth.hashers.{hasher}' for hasher in self.HASHER_PROFILES[profile]]
+
+    def configure(self, editor):
+        editor.set_value('SESSION_ENGINE', self.SESSION_ENGINES[self.session])
+        if self.HASHER_PROFILES[self.hashers]:
+            editor.set_value('PASSWORD_HASHERS', self.password_hashers(self.hashers))
+        if self.login_attempts:
+            editor.set_value('LOGIN_RATE_LIMIT', {
+                'ATTEMPTS': self.login_attempts,
+                'WINDOW': self.login_window,
+                'CACHE_ALIAS': 'default',
+            })
+
+    def test_settings_content(self, project_name):
+        return (f"from {project_name}.settings import *  # noqa: F401,F403\n\n"
+                f"# Password hashing dominates auth-heavy test suites; never use these hashers in production\n"
+                f"PASSWORD_HASHERS = {self.password_hashers('fast')!r}\n")
+
+    def warnings(self, cache_profile):
+        shared_cache = cache_profile is not None and cache_profile.backend in ('redis', 'file')
+        if self.session == 'cache' and not shared_cache:
+            yield "cache sessions without a shared cache (--cache redis or file) are lost on restart and not shared between workers."
+        if self.login_attempts and not shared_cache:
+            yield "login attempts are counted per process without a shared cache (--cache redis or file)."
+
+    def requirements(self):
+        return {'argon2': ['argon2-cffi'], 'bcrypt': ['bcrypt']}.get(self.hashers, [])
+
+class StaticAssetStage:
+    # Vendors third-party assets into <project>/static so pages load without a CDN round
+    # trip, and configures hashed filenames (ManifestStaticFilesStorage) that can be cached
+    # forever. With WhiteNoise the app serves them itself, pre-compressed as gzip and brotli.
+    VENDOR_ASSETS = {
+        'vendor/bootstrap/4.3.1/css/bootstrap.min.css': BOOTSTRAP_CSS_URL,
+    }
+
+    def __init__(self, whitenoise=False, source_dir=None, cache_root=None):
+        self.whitenoise = whitenoise
+        self.source_dir = source_dir
+        self.asset_cache = os.path.join(cache_root or DEFAULT_CACHE_ROOT, 'static')
+        self.vendored = False
+
+    def local_source(self, relative_path):
+        source_path = os.path.join(self.source_dir, relative_path) if self.source_dir else None
+        return source_path if source_path and os.path.exists(source_path) else None
+
+    def fetch(self, relative_path, url):
+        # Assets come from --static-source, then the shared cache, then the network
+        source_path = self.local_source(relative_path)
+        if source_path:
+            return source_path
+        cached_path = os.path.join(self.asset_cache, relative_path)
+        if os.path.exists(cached_path):
+            return cached_path
+        os.makedirs(os.path.dirname(cached_path), exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response, open(cached_path + '.part', 'wb') as file:
+            shutil.copyfileobj(response, file)
+        os.replace(cached_path + '.part', cached_path)
+        return cached_path
+
+    def vendor(self, project_path):
+        try:
+            for relative_path, url in self.VENDOR_ASSETS.items():
+                target_path = os.path.join(project_path, 'static', relative_path)
+                # Vendored files are refreshed only from --static-source, never re-downloaded
+                if os.path.exists(target_path) and not self.local_source(relative_path):
+                    continue
+                asset_path = self.fetch(relative_path, url)
+                if not os.path.exists(target_path) or not filecmp.cmp(asset_path, target_path, shallow=False):
+                    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                    shutil.copyfile(asset_path, target_path)
+            self.vendored = True
+        except OSError as e:
+            print(f"Could not vendor static assets ({e}), templates will link the CDN instead.")
+            self.vendored = False
+        return self.vendored
+
+    def asset_hashes(self, project_path):
+        # Plan input for collectstatic, so a refreshed asset is collected again
+        hashes = {}
+        for relative_path in self.VENDOR_ASSETS:
+            with open(os.path.join(project_path, 'static', relative_path), 'rb') as file:
+                hashes[relative_path] = hashlib.sha256(file.read()).hexdigest()
+        return hashes
+
+    def template_context(self):
+        if not self.vendored:
+            return {'stylesheet_href': BOOTSTRAP_CSS_URL, 'template_preamble': ''}
+        stylesheet = next(iter(self.VENDOR_ASSETS))
+        return {'stylesheet_href': f"{{% static '{stylesheet}' %}}", 'template_preamble': "{% load static %}\n"}
+
+    def configure(self, editor):
+        editor.set_value('STATIC_ROOT', PythonExpression("BASE_DIR / 'staticfiles'"))
+        editor.set_value('STATICFILES_DIRS', [PythonExpression("BASE_DIR / 'static'")])
+        if self.whitenoise:
+            storage = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+            editor.extend_list('MIDDLEWARE', ["'whitenoise.middleware.WhiteNoiseMiddleware'"],
+                               after="'django.middleware.security.SecurityMiddleware'")
+            # WhiteNoise serves hashed names as immutable already; unhashed files keep its
+            # short default max-age so changes to them still reach clients
+            editor.remove('WHITENOISE_MAX_AGE')
+        else:
+            storage = 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'
+        editor.set_value('STORAGES', {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': storage},
+        })
+
+    def requirements(self):
+        return ['whitenoise[brotli]'] if self.whitenoise else []
+
+class ProfilingProfile:
+    # Generates a request_profiling app: a middleware that times each request, counts its
+    # queries and DB time, warns about likely N+1 patterns and slow requests and adds a
+    # Server-Timing header, plus a slowest_endpoints management command over its log.
+    # DJANGO_PROFILING=1/0 toggles it per environment; it defaults to on with DEBUG.
+    APP_LABEL = 'request_profiling'
+    MODULES = {
+        'middleware.py': 'profiling/middleware.py.tmpl',
+        os.path.join('management', 'commands', 'slowest_endpoints.py'): 'profiling/slowest_endpoints.py.tmpl',
+    }
+
+    def __init__(self, n_plus_one_threshold=5, slow_request_ms=500, server_timing=True,
+                 log_file='profiling.jsonl'):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_request_ms = slow_request_ms
+        self.server_timing = server_timing
+        self.log_file = log_file
+
+    def settings(self):
+        return {
+            'ENABLED': PythonExpression("os.environ.get('DJANGO_PROFILING', '1' if DEBUG else '0') == '1'"),
+            'N_PLUS_ONE_THRESHOLD': self.n_plus_one_threshold,
+            'SLOW_REQUEST_MS': self.slow_request_ms,
+            'SERVER_TIMING': self.server_timing,
+            'LOG_PATH': PythonExpression(f"BASE_DIR / {self.log_file!r}"),
+        }
 
-    return setup_script_path
+    def write_app(self, project_path, templates):
+        app_path = os.path.join(project_path, self.APP_LABEL)
+        for package in ('', 'management', os.path.join('management', 'commands')):
+            os.makedirs(os.path.join(app_path, package), exist_ok=True)
+            open(os.path.join(app_path, package, '__init__.py'), 'a').close()
+        for module, template in self.MODULES.items():
+            with open(os.path.join(app_path, module), 'w') as file:
+                file.write(templates.render(template))
+
+    def configure(self, editor):
+        editor.add_import("import os")
+        editor.extend_list('INSTALLED_APPS', [repr(self.APP_LABEL)])
+        # Outermost, so the timing covers the rest of the middleware stack too
+        editor.extend_list('MIDDLEWARE', [f"'{self.APP_LABEL}.middleware.ProfilingMiddleware'"],
+                           before="'django.middleware.security.SecurityMiddleware'")
+        editor.set_value('PROFILING', self.settings())
+
+SECRET_KEY_CHECK = """if not DEBUG and not os.environ.get('DJANGO_SECRET_KEY'):
+    raise ImproperlyConfigured('DJANGO_SECRET_KEY must be set when DEBUG is off.')
+"""
+
+class DeployProfile:
+    # Production artifacts: a gunicorn config sized from the CPU count (gthread workers for
+    # WSGI, uvicorn workers for ASGI), a multi-stage slim Dockerfile with precompiled
+    # bytecode, pinned requirements and settings that read secrets and DEBUG from the
+    # environment instead of the development defaults.
+    def __init__(self, asgi=False, requirements=None, collect_static=False):
+        self.asgi = asgi
+        self.requirements = sorted(set(requirements or pin_requirements(DEFAULT_REQUIREMENTS)))
+        self.collect_static = collect_static
+
+    def server_requirements(self):
+        return ['gunicorn', 'uvicorn-worker'] if self.asgi else ['gunicorn']
+
+    def gunicorn_context(self, project_name):
+        if self.asgi:
+            # Async workers multiplex requests themselves; one per core is enough
+            return {'project_name': project_name, 'worker_class': repr('uvicorn_worker.UvicornWorker'),
+                    'workers': 'cpu_count', 'threads': 1}
+        return {'project_name': project_name, 'worker_class': repr('gthread'),
+                'workers': 'cpu_count * 2 + 1', 'threads': 2}
+
+    def dockerfile_context(self, project_name):
+        module = 'asgi' if self.asgi else 'wsgi'
+        context = {
+            'project_name': project_name,
+            'python_version': f'{sys.version_info.major}.{sys.version_info.minor}',
+            'application': f'{project_name}.{module}:application',
+            'build_packages': '',
+            'runtime_packages': '',
+            'collect_static': '',
+        }
+        if 'psycopg2' in map(requirement_name, self.requirements):
+            # psycopg2 builds from source against libpq; only the runtime library ships
+            context['build_packages'] = ('RUN apt-get update && apt-get install -y --no-install-recommends '
+                                         'build-essential libpq-dev && rm -rf /var/lib/apt/lists/*\n')
+            context['runtime_packages'] = ('RUN apt-get update && apt-get install -y --no-install-recommends '
+                                           'libpq5 && rm -rf /var/lib/apt/lists/*\n')
+        if self.collect_static:
+            # collectstatic needs no real secret, but settings refuse to load without one
+            context['collect_static'] = ('RUN DJANGO_DEBUG=0 DJANGO_SECRET_KEY=collectstatic '
+                                         'python manage.py collectstatic --noinput\n')
+        return context
+
+    def pinned_requirements(self, python):
+        # Pin what the scaffold actually installed so the image matches the local project
+        try:
+            result = run_traced([python, '-m', 'pip', 'freeze'], check=True, capture_output=True, text=True)
+            return result.stdout
+        except (OSError, subprocess.CalledProcessError):
+            print("Could not read installed versions, writing unpinned requirements.")
+            return ''.join(f'{requirement}\n' for requirement in
+                           self.requirements + pin_requirements(self.server_requirements()))
+
+    def configure(self, editor):
+        editor.add_import("import os")
+        editor.add_import("from django.core.exceptions import ImproperlyConfigured")
+        secret_key = editor.literal('SECRET_KEY')
+        if isinstance(secret_key, str):
+            editor.set_value('SECRET_KEY', PythonExpression(f"os.environ.get('DJANGO_SECRET_KEY', {secret_key!r})"))
+        # The committed development key is only acceptable while DEBUG is on
+        debug = "DEBUG = os.environ.get('DJANGO_DEBUG', '1') == '1'\n"
+        if SECRET_KEY_CHECK not in editor.source:
+            debug += SECRET_KEY_CHECK
+        editor.set_assignment('DEBUG', debug)
+        editor.set_value('ALLOWED_HOSTS', PythonExpression(
+            "os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1,[::1]').split(',')"))
 
 class DjangoProjectSetup:
-    def __init__(self, project_name, apps):
+    def __init__(self, project_name, apps, app_mode='inprocess', app_workers=1,
+                 requirements=None, cache_root=None, use_wheel_cache=True, projects_root=None, shared_env=None):
         self.project_name = project_name
         self.apps = apps
+        self.app_mode = app_mode
+        self.app_workers = app_workers
+        self.requirements = requirements or pin_requirements(DEFAULT_REQUIREMENTS)
+        self.projects_root = projects_root or DEFAULT_PROJECTS_ROOT
         self.project_path = self.get_project_path()
-        self.env_path = os.path.join(self.project_path, 'env')
-        create_virtual_env(self.env_path)
+        if shared_env:
+            # The environment is already installed; nothing to create or download
+            self.wheel_cache = None
+            self.shared_env = True
+            self.env_path = shared_env
+            link_shared_env(self.project_path, shared_env)
+        else:
+            self.wheel_cache = WheelCache(self.requirements, cache_root) if use_wheel_cache else None
+            self.shared_env = False
+            self.env_path = os.path.join(self.project_path, 'env')
+            with TRACER.span('create_virtual_env'):
+                create_virtual_env(self.env_path)
+            if self.wheel_cache:
+                with TRACER.span('wheel_cache'):
+                    self.wheel_cache.ensure(get_env_python(self.env_path))
         self.project_full_path = self.project_path
-        self.create_and_run_setup_script()
+        with TRACER.span('project_setup'):
+            self.run_setup()
+
+    @classmethod
+    def existing(cls, project_name, apps, project_path, env_path=None):
+        # Bind to an already scaffolded project without creating or installing anything
+        setup = cls.__new__(cls)
+        setup.project_name = project_name
+        setup.apps = apps
+        setup.app_mode, setup.app_workers = 'inprocess', 1
+        setup.requirements, setup.wheel_cache, setup.shared_env = pin_requirements(DEFAULT_REQUIREMENTS), None, False
+        setup.projects_root = os.path.dirname(project_path)
+        setup.project_path = setup.project_full_path = project_path
+        setup.env_path = env_path or os.path.join(project_path, 'env')
+        return setup
 
     def get_project_path(self):
-        default_path = os.path.join(os.path.expanduser("~"), 'DjangoProjects', self.project_name)
+        default_path = os.path.join(self.projects_root, self.project_name)
         print(f"Default path for Django project is set to: {default_path}")
         if not os.path.exists(default_path):
             print(f"The path {default_path} does not exist. Creating it.")
             os.makedirs(default_path)
         return default_path
 
-    def create_and_run_setup_script(self):
-        setup_script = create_setup_script(self.env_path, self.project_path, self.project_name, self.apps)
-        run_batch_script_and_wait(setup_script)
+    def is_scaffolded(self):
+        if not os.path.exists(os.path.join(self.project_path, 'manage.py')):
+            return False
+        return all(os.path.isdir(os.path.join(self.project_path, app)) for app in self.apps)
+
+    def installed_requirements_path(self):
+        # Same marker a SharedEnvironment keeps: the requirement set last installed into the env
+        return os.path.join(self.env_path, '.complete')
+
+    def requirements_installed(self):
+        try:
+            with open(self.installed_requirements_path(), 'r') as file:
+                return file.read().split() == sorted(set(self.requirements))
+        except OSError:
+            return False
+
+    def install_commands(self, python):
+        # pip and the generators run with the virtualenv's interpreter directly, so no
+        # activation script or platform shell is involved. The install is repeated whenever
+        # the requirement set changes, e.g. a re-run that adds --cache redis or --deploy.
+        if self.shared_env or self.requirements_installed():
+            return []
+        if self.wheel_cache:
+            return [self.wheel_cache.install_command(python)]
+        return [[python, '-m', 'pip', 'install'] + self.requirements]
+
+    def generate_commands(self, python):
+        if self.app_mode == 'inprocess':
+            # Project and all apps are generated by a single interpreter
+            script_path = write_app_generator_script(self.project_path, self.project_name, self.apps, self.app_workers)
+            return [[python, script_path]]
+        commands = []
+        if not os.path.exists(os.path.join(self.project_path, 'manage.py')):
+            commands.append([python, '-m', 'django', 'startproject', self.project_name, '.'])
+        commands += [[python, '-m', 'django', 'startapp', app] for app in self.apps
+                     if not os.path.exists(os.path.join(self.project_path, app))]
+        return commands
+
+    def run_setup(self):
+        python = get_env_python(self.env_path)
+        commands = self.install_commands(python)
+        if self.is_scaffolded():
+            print("Project and apps already exist, skipping generation.")
+        elif self.app_mode == 'resident':
+            generate_project_in_process(self.project_path, self.project_name, self.apps)
+        else:
+            commands += self.generate_commands(python)
+        try:
+            for command in commands:
+                run_traced(command, cwd=self.project_path, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Project setup failed: {e}")
+            sys.exit(1)
+        if not self.shared_env and not self.requirements_installed():
+            with open(self.installed_requirements_path(), 'w') as file:
+                file.write('\n'.join(sorted(set(self.requirements))) + '\n')
 
     def check_and_install_django(self):
         activate_script = os.path.join(self.env_path, "Scripts", "activate") if os.name == 'nt' else os.path.join(self.env_path, "bin", "activate")
@@ -84,47 +1181,354 @@ class DjangoProjectSetup:
             subprocess.run(command, shell=True)
             
     def configure_settings(self, db_engine, db_name, db_user, db_password, db_host, db_port, apps):
+        profile = DatabaseProfile(db_engine, db_name, db_user, db_password, db_host, db_port)
+        return self.apply_database_profile(profile, apps, 'auth_app' if 'auth_app' in apps else None)
+
+    def apply_database_profile(self, profile, apps, auth_app=None):
         settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
 
-        # Read the current content of settings.py
-        with open(settings_path, 'r') as file:
-            settings_content = file.readlines()
-
-        # Prepare the new database configuration
-        new_db_config = (
-            "AUTH_USER_MODEL = 'auth_app.CustomUser'\n"  # Set custom user model
-            "DATABASES = {\n"
-            "    'default': {\n"
-            f"        'ENGINE': '{db_engine}',\n"
-            f"        'NAME': '{db_name}',\n"
-            f"        'USER': '{db_user}',\n"
-            f"        'PASSWORD': '{db_password}',\n"
-            f"        'HOST': '{db_host}',\n"
-            f"        'PORT': '{db_port}',\n"
-            "    }\n"
-        )
+        # Parse settings.py once and apply every edit in a single write
+        editor = PythonSourceEditor(settings_path)
+        editor.add_import("import os")
+        if auth_app:
+            editor.set_value('AUTH_USER_MODEL', f'{auth_app}.CustomUser')  # Set custom user model
+        else:
+            # Drop a custom user model written for an auth app the spec no longer has
+            user_model = editor.literal('AUTH_USER_MODEL')
+            if isinstance(user_model, str) and user_model.endswith('.CustomUser') \
+                    and user_model.split('.')[0] not in apps:
+                editor.remove('AUTH_USER_MODEL')
+        editor.set_value('DATABASES', profile.databases())
+
+        if profile.replicas:
+            router_path = os.path.join(self.project_path, self.project_name, 'db_router.py')
+            with open(router_path, 'w') as file:
+                file.write(profile.router_content())
+            editor.set_value('DATABASE_ROUTERS', [f'{self.project_name}.db_router.PrimaryReplicaRouter'])
+
+        # Add all apps to INSTALLED_APPS, ignoring ones already listed
+        editor.extend_list('INSTALLED_APPS', [repr(app) for app in apps])
+        return editor.save()
+
+    def apply_cache_profile(self, profile):
+        settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
+        editor = PythonSourceEditor(settings_path)
+        editor.add_import("import os")
+        editor.set_value('CACHES', profile.caches(self.project_name))
+
+        # Compile each template once per process with the cached loader
+        templates = editor.literal('TEMPLATES')
+        if templates:
+            templates[0]['APP_DIRS'] = False
+            templates[0].setdefault('OPTIONS', {})['loaders'] = [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ]
+            editor.set_value('TEMPLATES', templates)
+        else:
+            print("TEMPLATES is not a plain literal, leaving template loaders unchanged.")
+        return editor.save()
 
-        # Find and replace the existing DATABASES definition
-        new_settings_content = []
-        db_section_found = False
-        for line in settings_content:
-            if line.strip().startswith('DATABASES = {'):
-                new_settings_content.append(new_db_config)
-                db_section_found = True
-            elif db_section_found and line.strip() == '}':
-                db_section_found = False
-            elif not db_section_found:
-                new_settings_content.append(line)
-
-        # Add all apps to INSTALLED_APPS
-        installed_apps_index = next(i for i, line in enumerate(new_settings_content) if 'INSTALLED_APPS' in line)
-        for app in apps:
-            new_settings_content.insert(installed_apps_index + 1, f"    '{app}',\n")
-            installed_apps_index += 1
+    def apply_auth_profile(self, profile):
+        settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
+        editor = PythonSourceEditor(settings_path)
+        profile.configure(editor)
+        editor.save()
+        if profile.test_settings:
+            test_settings_path = os.path.join(self.project_path, self.project_name, 'test_settings.py')
+            with open(test_settings_path, 'w') as file:
+                file.write(profile.test_settings_content(self.project_name))
+        return settings_path
+
+    def write_asgi_entry_point(self, workers=None, host='127.0.0.1', port=8000):
+        # Default to one worker per CPU unless WEB_CONCURRENCY says otherwise
+        workers = workers or 'os.cpu_count() or 1'
+        server_path = os.path.join(self.project_path, 'serve_asgi.py')
+        with open(server_path, 'w') as file:
+            file.write(ASGI_SERVER_TEMPLATE.format(project_name=self.project_name, workers=workers,
+                                                   host=host, port=port))
+
+        settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
+        editor = PythonSourceEditor(settings_path)
+        editor.set_value('ASGI_APPLICATION', f'{self.project_name}.asgi.application')
+        editor.save()
+        return server_path
 
-        # Write the modified settings back to the file
-        with open(settings_path, 'w') as file:
-            file.writelines(new_settings_content)
+    def apply_static_assets(self, stage):
+        settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
+        editor = PythonSourceEditor(settings_path)
+        stage.configure(editor)
+        return editor.save()
+
+    def apply_profiling(self, profile, templates):
+        profile.write_app(self.project_path, templates)
+        settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
+        editor = PythonSourceEditor(settings_path)
+        profile.configure(editor)
+        return editor.save()
+
+    def write_deploy_artifacts(self, profile, templates):
+        artifacts = {
+            'gunicorn.conf.py': templates.render('deploy/gunicorn.conf.py.tmpl',
+                                                 **profile.gunicorn_context(self.project_name)),
+            'Dockerfile': templates.render('deploy/Dockerfile.tmpl', **profile.dockerfile_context(self.project_name)),
+            '.dockerignore': templates.render('deploy/dockerignore.tmpl'),
+            'requirements.txt': profile.pinned_requirements(get_env_python(self.env_path)),
+        }
+        for file_name, content in artifacts.items():
+            with open(os.path.join(self.project_path, file_name), 'w') as file:
+                file.write(content)
+
+        settings_path = os.path.join(self.project_path, self.project_name, 'settings.py')
+        editor = PythonSourceEditor(settings_path)
+        profile.configure(editor)
+        editor.save()
+        print(f"Deployment artifacts written: {', '.join(artifacts)}")
+        return list(artifacts)
+
+    def collect_static(self):
+        python = get_env_python(self.env_path)
+        try:
+            run_traced([python, 'manage.py', 'collectstatic', '--noinput', '--verbosity', '0'],
+                           cwd=self.project_path, check=True)
+            print("Static files collected.")
+        except subprocess.CalledProcessError:
+            print("Error collecting static files.")
+            sys.exit(1)
+
+class FieldSpec:
+    # One model field: FieldSpec('title', 'CharField', max_length=200, db_index=True).
+    # Values are rendered with repr(), so wrap code such as _('groups') in PythonExpression.
+    def __init__(self, name, field_type, *args, **options):
+        self.name = name
+        self.field_type = field_type
+        self.args = args
+        self.options = options
+
+    def render(self):
+        arguments = [repr(arg) for arg in self.args]
+        arguments += [f"{key}={value!r}" for key, value in self.options.items()]
+        line = f"    {self.name} = models.{self.field_type}({', '.join(arguments)})"
+        if len(line) <= 100:
+            return line + '\n'
+        body = ''.join(f"        {argument},\n" for argument in arguments)
+        return f"    {self.name} = models.{self.field_type}(\n{body}    )\n"
+
+class ModelSpec:
+    # Declarative model definition. indexes and unique_together are lists of field lists
+    # rendered into Meta.indexes / Meta.constraints; select_related and prefetch_related
+    # produce a queryset with a with_related() method for the declared relations.
+    def __init__(self, name, fields, base='models.Model', indexes=None, unique_together=None,
+                 select_related=None, prefetch_related=None, manager_base='models.Manager',
+                 ordering=None, str_field=None, comment=None):
+        self.name = name
+        self.fields = fields
+        self.base = base
+        self.indexes = indexes or []
+        self.unique_together = unique_together or []
+        self.select_related = select_related or []
+        self.prefetch_related = prefetch_related or []
+        self.manager_base = manager_base
+        self.ordering = ordering
+        self.str_field = str_field
+        self.comment = comment
+
+    def index_name(self, app_label, fields, suffix):
+        # Index and constraint names must be unique per database and at most 30 characters
+        digest = hashlib.sha256(f"{app_label}.{self.name}.{','.join(fields)}".encode('utf-8')).hexdigest()[:6]
+        return f"{app_label[:8]}_{self.name.lower()[:8]}_{digest}_{suffix}"
+
+    def render_queryset(self):
+        if not (self.select_related or self.prefetch_related):
+            return ''
+        lookups = ''
+        if self.select_related:
+            lookups += f".select_related({', '.join(repr(field) for field in self.select_related)})"
+        if self.prefetch_related:
+            lookups += f".prefetch_related({', '.join(repr(field) for field in self.prefetch_related)})"
+        # The manager is a named class so migrations can import it
+        return (f"class {self.name}QuerySet(models.QuerySet):\n"
+                f"    def with_related(self):\n"
+                f"        return self{lookups}\n\n\n"
+                f"class {self.name}Manager({self.manager_base}.from_queryset({self.name}QuerySet)):\n"
+                f"    pass\n\n\n")
+
+    def render_meta(self, app_label):
+        meta = []
+        if self.ordering:
+            meta.append(f"        ordering = {self.ordering!r}\n")
+        if self.indexes:
+            meta.append("        indexes = [\n")
+            for fields in self.indexes:
+                meta.append(f"            models.Index(fields={list(fields)!r}, "
+                            f"name={self.index_name(app_label, fields, 'idx')!r}),\n")
+            meta.append("        ]\n")
+        if self.unique_together:
+            meta.append("        constraints = [\n")
+            for fields in self.unique_together:
+                meta.append(f"            models.UniqueConstraint(fields={list(fields)!r}, "
+                            f"name={self.index_name(app_label, fields, 'uniq')!r}),\n")
+            meta.append("        ]\n")
+        if not meta:
+            return ''
+        return "\n    class Meta:\n" + ''.join(meta)
+
+    def render(self, app_label):
+        lines = [self.render_queryset()]
+        if self.comment:
+            lines.append(f"# {self.comment}\n")
+        lines.append(f"class {self.name}({self.base}):\n")
+        body = [field.render() for field in self.fields]
+        if self.select_related or self.prefetch_related:
+            body.append(f"\n    objects = {self.name}Manager()\n")
+        body.append(self.render_meta(app_label))
+        if self.str_field:
+            body.append(f"\n    def __str__(self):\n        return self.{self.str_field}\n")
+        # A model without fields, manager, Meta or __str__ still needs a class body
+        lines.extend(body if ''.join(body) else ["    pass\n"])
+        return ''.join(lines)
+
+def render_models_module(app_label, model_specs, imports=("from django.db import models",)):
+    header = ''.join(f"{line}\n" for line in imports)
+    return '\n' + header + ''.join(f"\n\n{spec.render(app_label)}" for spec in model_specs)
+
+def auth_app_model_specs():
+    # UserType names are unique; users are filtered and authorized by user_type, usually
+    # together with is_active, which the composite index covers (user_type leads, so it
+    # serves user_type-only lookups too). Permission checks walk groups and
+    # user_permissions, which with_related() prefetches.
+    return [
+        ModelSpec('UserType', [
+            FieldSpec('name', 'CharField', max_length=20),
+        ], unique_together=[['name']], str_field='name', comment="Define user types"),
+        ModelSpec('CustomUser', [
+            FieldSpec('user_type', 'CharField', max_length=20, choices=[
+                ('visitor', 'Visitor'),
+                ('traverser', 'Traverser'),
+                ('administrator', 'Administrator'),
+            ], default='visitor'),
+            # Adding related_name to avoid clashes
+            FieldSpec('groups', 'ManyToManyField', PythonExpression('Group'),
+                      verbose_name=PythonExpression("_('groups')"), blank=True,
+                      help_text=PythonExpression("_('The groups this user belongs to.')"),
+                      related_name='customuser_set', related_query_name='customuser'),
+            FieldSpec('user_permissions', 'ManyToManyField', PythonExpression('Permission'),
+                      verbose_name=PythonExpression("_('user permissions')"), blank=True,
+                      help_text=PythonExpression("_('Specific permissions for this user.')"),
+                      related_name='customuser_set', related_query_name='customuser'),
+        ], base='AbstractUser', indexes=[['user_type', 'is_active']],
+            prefetch_related=['groups', 'user_permissions'], manager_base='UserManager',
+            str_field='username', comment="User Custom Model"),
+    ]
+
+def model_spec_from_dict(model):
+    # Build a ModelSpec from its project spec table; on_delete names a models.* constant
+    fields = []
+    for field in model.get('fields', []):
+        options = {key: value for key, value in field.items() if key not in ('name', 'type', 'args')}
+        if isinstance(options.get('on_delete'), str):
+            options['on_delete'] = PythonExpression(f"models.{options['on_delete']}")
+        fields.append(FieldSpec(field['name'], field['type'], *field.get('args', []), **options))
+    return ModelSpec(model['name'], fields, indexes=model.get('indexes'),
+                     unique_together=model.get('unique_together'),
+                     select_related=model.get('select_related'), prefetch_related=model.get('prefetch_related'),
+                     ordering=model.get('ordering'), str_field=model.get('str_field'))
+
+class SimpleTemplateEngine:
+    # Fallback used when Jinja2 is not installed. Supports [[ name ]] substitution and
+    # one level of [% extends %] / [% block %] inheritance, which is all the scaffold
+    # templates use. Each template is compiled once into literal and variable parts.
+    block_pattern = re.compile(r'\[% block (\w+) %\](.*?)\[% endblock %\]', re.DOTALL)
+    extends_pattern = re.compile(r'\[% extends "([^"]+)" %\]')
+    variable_pattern = re.compile(r'\[\[\s*(\w+)\s*\]\]')
+
+    def __init__(self, search_path):
+        self.search_path = search_path
+        self.compiled = {}
+
+    def load_source(self, name):
+        for directory in self.search_path:
+            template_path = os.path.join(directory, name)
+            if os.path.exists(template_path):
+                with open(template_path, 'r') as file:
+                    return file.read()
+        raise FileNotFoundError(f"Scaffold template {name} not found in {', '.join(self.search_path)}")
+
+    def resolve(self, name):
+        source = self.load_source(name)
+        parent = self.extends_pattern.search(source)
+        if not parent:
+            return source
+        blocks = {match.group(1): match.group(2) for match in self.block_pattern.finditer(source)}
+        parent_source = self.resolve(parent.group(1))
+        return self.block_pattern.sub(lambda match: blocks.get(match.group(1), match.group(2)), parent_source)
+
+    def compile(self, name):
+        parts = self.variable_pattern.split(self.resolve(name))
+        # Even indexes are literal text, odd indexes are variable names
+        return [(index % 2 == 1, part) for index, part in enumerate(parts)]
+
+    def render(self, name, context):
+        if name not in self.compiled:
+            self.compiled[name] = self.compile(name)
+        return ''.join(str(context[part]) if is_variable else part for is_variable, part in self.compiled[name])
+
+class JinjaTemplateEngine:
+    # Jinja2 with a bytecode cache on disk, so templates are parsed once across runs.
+    # The delimiters are [% %] and [[ ]] because the generated Django templates contain
+    # {% %} and {{ }} that must pass through untouched.
+    def __init__(self, search_path, cache_dir):
+        import jinja2
+        os.makedirs(cache_dir, exist_ok=True)
+        self.environment = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(search_path),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(cache_dir),
+            block_start_string='[%', block_end_string='%]',
+            variable_start_string='[[', variable_end_string=']]',
+            comment_start_string='[#', comment_end_string='#]',
+            keep_trailing_newline=True,
+            undefined=jinja2.StrictUndefined,
+        )
+
+    def render(self, name, context):
+        return self.environment.get_template(name).render(context)
+
+class TemplateRegistry:
+    # Scaffold templates loaded from scaffold_templates/, optionally overlaid by a theme
+    # directory whose files take precedence (e.g. a custom base.html)
+    def __init__(self, theme_dir=None, engine='auto', cache_dir=None):
+        self.search_path = ([theme_dir] if theme_dir else []) + [TEMPLATE_ROOT]
+        cache_dir = cache_dir or os.path.join(DEFAULT_CACHE_ROOT, 'templates')
+        if engine == 'auto':
+            try:
+                import jinja2  # noqa: F401
+                engine = 'jinja2'
+            except ImportError:
+                engine = 'simple'
+        self.engine_name = engine
+        if engine == 'jinja2':
+            self.engine = JinjaTemplateEngine(self.search_path, cache_dir)
+        else:
+            self.engine = SimpleTemplateEngine(self.search_path)
+
+    def render(self, name, **context):
+        return self.engine.render(name, context)
+
+    def fingerprint(self):
+        # Hash of every template source on the search path; part of the plan inputs, so
+        # editing a built-in or theme template re-runs the steps that render it
+        digest = hashlib.sha256()
+        for directory in self.search_path:
+            for root, dirs, files in os.walk(directory):
+                dirs.sort()
+                for file_name in sorted(files):
+                    template_path = os.path.join(root, file_name)
+                    digest.update(os.path.relpath(template_path, directory).replace(os.sep, '/').encode('utf-8'))
+                    with open(template_path, 'rb') as file:
+                        digest.update(hashlib.sha256(file.read()).digest())
+        return digest.hexdigest()
 
 class AppPathManager:
     def __init__(self,project_full_path , project_name, apps):
@@ -149,18 +1553,158 @@ class AppPathManager:
             return os.path.join(app_path, file_name)
         return None
     
+class ScaffoldManifest:
+    # Records a content hash for every file the scaffolder owns in a project, plus the
+    # generator version, so re-runs can tell which outputs actually need rewriting
+    def __init__(self, project_path):
+        self.project_path = project_path
+        self.path = os.path.join(project_path, MANIFEST_FILE_NAME)
+        self.files = {}
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            print(f"Ignoring unreadable manifest {self.path}")
+            return
+        # Outputs of a different generator version are regenerated from scratch
+        if data.get('generator_version') == GENERATOR_VERSION:
+            self.files = data.get('files', {})
+            self.entries = data.get('entries', {})
+
+    @staticmethod
+    def content_hash(content):
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def relative_path(self, file_path):
+        return os.path.relpath(file_path, self.project_path).replace(os.sep, '/')
+
+    def is_current(self, file_path, content):
+        recorded_hash = self.files.get(self.relative_path(file_path))
+        return recorded_hash == self.content_hash(content) and os.path.exists(file_path)
+
+    def file_matches(self, file_path):
+        # True when the file on disk is still exactly what we last wrote
+        recorded_hash = self.files.get(self.relative_path(file_path))
+        if recorded_hash is None or not os.path.exists(file_path):
+            return False
+        with open(file_path, 'r') as file:
+            return self.content_hash(file.read()) == recorded_hash
+
+    def record(self, file_path, content):
+        self.files[self.relative_path(file_path)] = self.content_hash(content)
+        self.dirty = True
+
+    def entry_is_current(self, name, value):
+        return self.entries.get(name) == self.content_hash(value)
+
+    def record_entry(self, name, value):
+        self.entries[name] = self.content_hash(value)
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        with open(self.path, 'w') as file:
+            json.dump({'generator_version': GENERATOR_VERSION, 'files': self.files, 'entries': self.entries},
+                      file, indent=2, sort_keys=True)
+        self.dirty = False
+
 class FileGenerator:
+    def __init__(self, batch=False, atomic=False, manifest=None):
+        # In batch mode fragments are collected in memory per target path and written
+        # by flush(), so each file is opened exactly once and each directory created once.
+        # With a manifest the generator owns the whole file: unchanged files are skipped
+        # and changed ones are rewritten instead of appended to.
+        self.batch = batch or manifest is not None
+        self.atomic = atomic
+        self.manifest = manifest
+        self.pending = {}
+        self.directories = set()
+
+    def ensure_directory(self, directory):
+        if self.batch:
+            self.directories.add(directory)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
     def create_file(self, file_path, content):
+        if self.batch:
+            self.pending.setdefault(file_path, []).append(content)
+            return
         with open(file_path, 'a') as file:
             file.write(content)
+        TRACER.record_write(file_path, len(content.encode('utf-8')))
 
     def create_or_append_file(self, file_path, content):
+        if self.batch:
+            self.pending.setdefault(file_path, []).append(content)
+            return
         if os.path.exists(file_path):
             with open(file_path, 'a') as file:
                 file.write(content)
         else:
             with open(file_path, 'w') as file:
                 file.write(content)
+        TRACER.record_write(file_path, len(content.encode('utf-8')))
+
+    def write_atomic(self, file_path, content, replace=False):
+        # Append to (or replace) the existing content through a temp file in the same
+        # directory, then rename over the target so readers never see a partial file
+        existing_content = ''
+        if not replace and os.path.exists(file_path):
+            with open(file_path, 'r') as file:
+                existing_content = file.read()
+        # mkstemp creates the file 0600; give it the target's mode, or what open() would use
+        try:
+            mode = os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or '.', prefix='.scaffold-')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(existing_content + content)
+            os.chmod(temp_path, mode)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def flush(self):
+        for directory in sorted(self.directories):
+            os.makedirs(directory, exist_ok=True)
+        written = 0
+        for file_path, fragments in self.pending.items():
+            content = ''.join(fragments)
+            if self.manifest is not None:
+                if self.manifest.is_current(file_path, content):
+                    continue
+                if self.atomic:
+                    self.write_atomic(file_path, content, replace=True)
+                else:
+                    with open(file_path, 'w') as file:
+                        file.write(content)
+                self.manifest.record(file_path, content)
+            elif self.atomic:
+                self.write_atomic(file_path, content)
+            else:
+                with open(file_path, 'a') as file:
+                    file.write(content)
+            TRACER.record_write(file_path, len(content.encode('utf-8')))
+            written += 1
+        if self.manifest is not None:
+            self.manifest.save()
+        self.pending = {}
+        self.directories = set()
+        return written
 
 class HTMLTemplateGenerator:
     def __init__(self, app_manager, file_generator):
@@ -169,7 +1713,7 @@ class HTMLTemplateGenerator:
 
     def generate_template(self, app_name, template_name, content):
         template_directory = os.path.join(self.app_manager.get_app_path(app_name), 'templates', app_name)
-        os.makedirs(template_directory, exist_ok=True)  # Create the template directory if it doesn't exist
+        self.file_generator.ensure_directory(template_directory)  # Create the template directory if it doesn't exist
         template_path = os.path.join(template_directory, template_name)
         self.file_generator.create_file(template_path, content)
 
@@ -197,202 +1741,197 @@ class AppFileEditor:
         if forms_path:
             self.file_generator.create_or_append_file(forms_path, forms_content)
 
+    def edit_module(self, app_name, file_name, content):
+        module_path = self.app_manager.get_file_path(app_name, file_name)
+        if module_path:
+            self.file_generator.create_or_append_file(module_path, content)
+
 class AppFileConfigurator:
-    def __init__(self, setup, app_manager, file_editor):
+    def __init__(self, setup, app_manager, file_editor, manifest=None, cache_profile=None, asgi=False,
+                 app_specs=None, templates=None, auth_profile=None, crud=False):
         self.setup = setup
         self.app_manager = app_manager
         self.file_editor = file_editor
+        self.manifest = manifest
+        self.cache_profile = cache_profile
+        self.auth_profile = auth_profile
+        self.crud = crud
+        self.asgi = asgi
+        self.app_specs = app_specs or {}
+        self.templates = templates or TemplateRegistry()
+        self.template_context = {'stylesheet_href': BOOTSTRAP_CSS_URL, 'template_preamble': ''}
         self.generated_views = {}  # Track generated views for each app
+        self.generated_routes = {}  # Route overrides per app and view, default '<app>/<view>/'
+        self.write_only_views = set()  # (app, view) pairs that only accept POST
+
+    def app_kind(self, app_name):
+        app_spec = self.app_specs.get(app_name, {})
+        if 'kind' in app_spec:
+            return app_spec['kind']
+        if app_name == 'auth_app':
+            return 'auth'
+        # With --crud, apps the spec says nothing about get the CRUD scaffolding
+        return 'crud' if self.crud and not app_spec else 'spec'
+
+    def auth_app(self):
+        # The app providing the custom user model, or None when the spec has no auth app
+        return next((app for app in self.app_specs if self.app_kind(app) == 'auth'), None)
+
+    def auth_views(self, app_name):
+        return {view: f'{app_name}/{template}' for view, template in AUTH_APP_VIEWS.items()}
+
+    def crud_models(self, app_name):
+        return self.app_specs.get(app_name, {}).get('models') or [CRUD_DEFAULT_MODEL]
+
+    def crud_prefix(self, model):
+        return re.sub(r'(?<!^)(?=[A-Z])', '_', model['name']).lower()
+
+    def register_views(self, app_name):
+        # Record the app's views and routes without generating any files, so the URL
+        # configuration can be computed even for apps whose generation is skipped
+        app_spec = self.app_specs.get(app_name, {})
+        if self.app_kind(app_name) == 'auth':
+            self.generated_views[app_name] = self.auth_views(app_name)
+            self.generated_routes[app_name] = {}
+        else:
+            self.generated_views[app_name] = dict(app_spec.get('views', {}))
+            self.generated_routes[app_name] = {}
+            if self.app_kind(app_name) == 'crud':
+                for model in self.crud_models(app_name):
+                    prefix = self.crud_prefix(model)
+                    for suffix, route in CRUD_VIEWS.items():
+                        self.generated_views[app_name][f'{prefix}_{suffix}'] = None
+                        self.generated_routes[app_name][f'{prefix}_{suffix}'] = f'{app_name}/{prefix}s/{route}'
+                        if suffix in CRUD_WRITE_VIEWS:
+                            self.write_only_views.add((app_name, f'{prefix}_{suffix}'))
+        self.generated_routes[app_name].update(app_spec.get('routes', {}))
 
     def configure_app(self, app_name):
         # Initialize an entry for the app in self.generated_views
-        self.generated_views[app_name] = {}
+        self.register_views(app_name)
 
         # Define methods to configure models, views, templates, etc. for each app
-        if app_name == 'auth_app':
+        if self.app_kind(app_name) == 'auth':
             self.configure_auth_app(app_name)
-        # Add more conditions for other apps as needed
+        elif self.app_kind(app_name) == 'crud':
+            self.configure_crud_app(app_name)
+        else:
+            self.configure_spec_app(app_name)
+
+        if self.cache_profile:
+            self.configure_cache_helpers(app_name)
+
+    def configure_spec_app(self, app_name):
+        # Generate the models, views and templates declared for the app in the project spec
+        app_spec = self.app_specs.get(app_name, {})
+        model_specs = [model_spec_from_dict(model) for model in app_spec.get('models', [])]
+        if model_specs:
+            self.file_editor.edit_models(app_name, render_models_module(app_name, model_specs))
+
+        views = app_spec.get('views', {})
+        if views:
+            views_content = "\nfrom django.shortcuts import render\n"
+            for view_name, template_name in views.items():
+                views_content += f"\n\ndef {view_name}(request):\n    return render(request, {template_name!r})\n"
+            self.file_editor.edit_views(app_name, views_content)
+
+        for template_name, template_content in app_spec.get('templates', {}).items():
+            self.file_editor.edit_templates(app_name, template_name, template_content)
+
+    def configure_crud_app(self, app_name):
+        # Declared models, views and templates as usual, then JSON CRUD endpoints per model
+        app_spec = self.app_specs.get(app_name, {})
+        models = self.crud_models(app_name)
+        if not app_spec.get('models'):
+            self.file_editor.edit_models(app_name, render_models_module(
+                app_name, [model_spec_from_dict(model) for model in models]))
+        self.configure_spec_app(app_name)
+
+        model_names = ', '.join(model['name'] for model in models)
+        views_content = f"\nfrom .crud import CrudEndpoints\nfrom .models import {model_names}\n"
+        if self.cache_profile:
+            # bulk_update sends no post_save, so the cached copies are dropped explicitly
+            views_content += "from django.core.cache import cache\nfrom .cache_utils import cache_key\n"
+        for model in models:
+            prefix = self.crud_prefix(model)
+            options = {'deferred_fields' if key == 'defer' else key: value
+                       for key, value in model.get('crud', {}).items()}
+            options['asynchronous'] = self.asgi
+            arguments = [model['name']] + [f"{key}={value!r}" for key, value in options.items()]
+            if self.cache_profile:
+                arguments.append(f"invalidate=lambda instances: cache.delete_many("
+                                 f"[cache_key({model['name']}, instance.pk) for instance in instances])")
+            line = f"{prefix}_endpoints = CrudEndpoints({', '.join(arguments)})"
+            if len(line) > 100:
+                line = f"{prefix}_endpoints = CrudEndpoints(\n" + ''.join(f"    {argument},\n" for argument in arguments) + ")"
+            views_content += f"\n\n{line}\n"
+            for suffix in CRUD_VIEWS:
+                views_content += f"{prefix}_{suffix} = {prefix}_endpoints.{suffix}_view\n"
+        self.file_editor.edit_views(app_name, views_content)
+        self.file_editor.edit_module(app_name, 'crud.py', self.templates.render('crud/crud.py.tmpl'))
+
+    def configure_cache_helpers(self, app_name):
+        # Low-level cache helpers for the app, with invalidation wired up in AppConfig.ready()
+        config_name = ''.join(part.capitalize() for part in app_name.split('_')) + 'Config'
+        self.file_editor.edit_module(app_name, 'cache_utils.py',
+                                     self.templates.render('app/cache_utils.py.tmpl', app_label=app_name,
+                                                           timeout=self.cache_profile.timeout))
+        self.file_editor.edit_module(app_name, 'apps.py',
+                                     self.templates.render('app/apps.py.tmpl', app_label=app_name,
+                                                           config_name=config_name))
 
     def configure_auth_app(self, app_name):
         # Define the content for models.py
-        models_content = """
-from django.db import models
-from django.contrib.auth.models import AbstractUser, Group, Permission
-from django.utils.translation import gettext_lazy as _
-
-# Define user types
-class UserType(models.Model):
-    name = models.CharField(max_length=20)
-
-    def __str__(self):
-        return self.name
-
-# User Custom Model
-class CustomUser(AbstractUser):
-    user_type = models.CharField(max_length=20, choices=[
-        ('visitor', 'Visitor'),
-        ('traverser', 'Traverser'),
-        ('administrator', 'Administrator')
-    ], default='visitor')
-
-    # Adding related_name to avoid clashes
-    groups = models.ManyToManyField(
-        Group,
-        verbose_name=_('groups'),
-        blank=True,
-        help_text=_('The groups this user belongs to.'),
-        related_name='customuser_set',
-        related_query_name='customuser',
-    )
-    user_permissions = models.ManyToManyField(
-        Permission,
-        verbose_name=_('user permissions'),
-        blank=True,
-        help_text=_('Specific permissions for this user.'),
-        related_name='customuser_set',
-        related_query_name='customuser',
-    )
-
-    def __str__(self):
-        return self.username
-        """
+        models_content = render_models_module(app_name, auth_app_model_specs(), [
+            "from django.db import models",
+            "from django.contrib.auth.models import AbstractUser, Group, Permission, UserManager",
+            "from django.utils.translation import gettext_lazy as _",
+        ])
         # Define the content for views.py
  
-        views_content = """
-from django.shortcuts import render, redirect
-from django.contrib.auth import login, authenticate, logout
-from django.contrib.auth.decorators import login_required
-from .forms import RegistrationForm, LoginForm
-
-def register(request):
-    if request.method == 'POST':
-        form = RegistrationForm(request.POST)
-        if form.is_valid():
-            user = form.save()
-            login(request, user)
-            return redirect('home')
-    else:
-        form = RegistrationForm()
-    return render(request, 'auth_app/register.html', {'form': form})
-
-def user_login(request):
-    if request.method == 'POST':
-        form = LoginForm(request.POST)
-        if form.is_valid():
-            username = form.cleaned_data['username']
-            password = form.cleaned_data['password']
-            user = authenticate(username=username, password=password)
-            if user:
-                login(request, user)
-                return redirect('auth_app_home')
-    else:
-        form = LoginForm()
-    return render(request, 'auth_app/login.html', {'form': form})
-
-def user_logout(request):
-    logout(request)
-    return redirect('auth_app_logout')
-
-@login_required(login_url='register')
-def home(request):
-    return render(request, 'auth_app/home.html')
+        views_template = 'auth_app/views_async.py.tmpl' if self.asgi else 'auth_app/views.py.tmpl'
+        views_content = '\n' + self.templates.render(views_template, app_label=app_name)
+        home_definition = "async def home(request):" if self.asgi else "def home(request):"
+
+        # home is the only view without a form, so it can be served from the cache;
+        # it varies on the session cookie because the page is per user
+        if self.cache_profile:
+            views_content += f"""
+@cache_page({self.cache_profile.view_timeout})
+@vary_on_cookie
+@login_required(login_url='{app_name}_user_login')
+{home_definition}
+    return render(request, '{app_name}/home.html')
+        """
+            views_content = views_content.replace(
+                "from .forms import",
+                "from django.views.decorators.cache import cache_page\n"
+                "from django.views.decorators.vary import vary_on_cookie\n"
+                "from .forms import", 1)
+        else:
+            views_content += f"""
+@login_required(login_url='{app_name}_user_login')
+{home_definition}
+    return render(request, '{app_name}/home.html')
         """
 
+        # Failed logins are throttled through the cache before they reach the password hasher
+        if self.auth_profile and self.auth_profile.login_attempts:
+            views_content = re.sub(r'^(async )?def user_login\(', r'@login_rate_limit\n\g<0>', views_content,
+                                   count=1, flags=re.MULTILINE)
+            views_content = views_content.replace(
+                "from .forms import", "from .ratelimit import login_rate_limit\nfrom .forms import", 1)
+            self.file_editor.edit_module(app_name, 'ratelimit.py',
+                                         self.templates.render('auth_app/ratelimit.py.tmpl', app_label=app_name))
+
         # Define the content for forms.py
-        forms_content = """
-from django import forms
-from django.contrib.auth.forms import UserCreationForm
-from .models import CustomUser
-
-class RegistrationForm(UserCreationForm):
-    class Meta:
-        model = CustomUser
-        fields = ['username', 'password1', 'password2']
-
-class LoginForm(forms.Form):
-    username = forms.CharField()
-    password = forms.CharField(widget=forms.PasswordInput)
-        """
+        forms_content = '\n' + self.templates.render('auth_app/forms.py.tmpl')
 
-        # HTML content for login, logout, register, and home templates
+        # HTML for login, logout, register and home, rendered from the shared base layout
         templates_content = {
-            'login.html': """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css">
-    <title>Login</title>
-</head>
-<body>
-    <div class="container mt-5">
-        <h1>Login</h1>
-        <form method="post" class="mt-3">
-            {% csrf_token %}
-            {{ form.as_p }}
-            <button type="submit" class="btn btn-primary">Login</button>
-        </form>
-    </div>
-</body>
-</html>
-            """,
-            'logout.html': """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css">
-    <title>Logout</title>
-</head>
-<body>
-    <div class="container mt-5">
-        <h1>Logout</h1>
-        <p>You have been logged out successfully.</p>
-        <a href="{% url 'login' %}" class="btn btn-primary">Login again</a>
-    </div>
-</body>
-</html>
-            """,
-            'register.html': """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css">
-    <title>Register</title>
-</head>
-<body>
-    <div class="container mt-5">
-        <h1>Register</h1>
-        <form method="post" class="mt-3">
-            {% csrf_token %}
-            {{ form.as_p }}
-            <button type="submit" class="btn btn-primary">Register</button>
-        </form>
-    </div>
-</body>
-</html>
-            """,
-            'home.html': """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.3.1/css/bootstrap.min.css">
-    <title>Home</title>
-</head>
-<body>
-    <div class="container">
-        <h1>Welcome to the Home Page</h1>
-        <p>This is the main page of the application, accessible only to logged-in users.</p>
-    </div>
-</body>
-</html>
-            """
+            template_name: self.templates.render(f'auth_app/{template_name}', app_label=app_name,
+                                                 **self.template_context)
+            for template_name in ('login.html', 'logout.html', 'register.html', 'home.html')
         }
 
         # Apply the content to the respective files
@@ -404,113 +1943,706 @@ class LoginForm(forms.Form):
             self.file_editor.edit_templates(app_name, template_name, template_content)
 
         # Update generated views for URL configuration
-        self.generated_views[app_name] = {
-            'register': 'auth_app/register.html',
-            'user_login': 'auth_app/login.html',
-            'user_logout': 'auth_app/logout.html',
-            'home': 'auth_app/home.html'
-        }
-    
-    def apply_migrations(self):
-        # Run makemigrations and migrate commands
-        activate_script = os.path.join(self.setup.env_path, "Scripts", "activate") if os.name == 'nt' else os.path.join(self.setup.env_path, "bin", "activate")
-        makemigrations_command = f'{activate_script} && cd {self.setup.project_full_path} && python manage.py makemigrations'
-        migrate_command = f'{activate_script} && cd {self.setup.project_full_path} && python manage.py migrate'
-        
+        self.generated_views[app_name] = self.auth_views(app_name)
+
+    def apply_migrations(self, squash=False):
+        # Run makemigrations and migrate in one Django process with the virtualenv's interpreter
+        script_path = write_migration_runner_script(self.setup.project_full_path, self.setup.project_name,
+                                                    self.app_manager.apps, squash)
+
         try:
-            subprocess.run(makemigrations_command, shell=True, check=True)
-            subprocess.run(migrate_command, shell=True, check=True)
+            run_traced([get_env_python(self.setup.env_path), script_path], cwd=self.setup.project_full_path, check=True)
             print("Database migrations applied successfully.")
         except subprocess.CalledProcessError:
             print("Error applying database migrations.")
             sys.exit(1)
 
+    def route_table(self):
+        # (app, view, route) for every generated view, in urlpatterns order
+        for app_name, views in self.generated_views.items():
+            app_routes = self.generated_routes.get(app_name, {})
+            for view_name in views:
+                yield app_name, view_name, app_routes.get(view_name, f'{app_name}/{view_name}/')
+
+    def write_load_test(self, server='runserver'):
+        # Every generated page becomes a load-test target; routes with URL parameters are
+        # left out because the harness has no objects to point them at
+        pages, auth_flow = [], None
+        for app_name, view_name, route in self.route_table():
+            if self.app_kind(app_name) == 'auth' and auth_flow is None:
+                auth_routes = dict((view, route) for app, view, route in self.route_table() if app == app_name)
+                auth_flow = {'register': f"/{auth_routes['register']}", 'login': f"/{auth_routes['user_login']}",
+                             'logout': f"/{auth_routes['user_logout']}"}
+            if '<' in route or (app_name, view_name) in self.write_only_views \
+                    or (self.app_kind(app_name) == 'auth' and view_name == 'user_logout'):
+                continue
+            pages.append((f'{app_name}.{view_name}', f'/{route}'))
+        pages_literal = '[\n' + ''.join(f"    ({name!r}, {path!r}),\n" for name, path in pages) + ']'
+        load_test_path = os.path.join(self.setup.project_full_path, 'loadtest.py')
+        with open(load_test_path, 'w') as file:
+            file.write(self.templates.render('project/loadtest.py.tmpl', project_name=repr(self.setup.project_name),
+                                             pages=pages_literal, auth_flow=format_python_value(auth_flow),
+                                             server=repr(server)))
+        print(f"Load-test harness written with {len(pages)} page(s); run 'python loadtest.py' in the project "
+              f"for a baseline.")
+        return load_test_path
+
     def update_main_urls(self):
         main_urls_path = os.path.join(self.setup.project_full_path, self.setup.project_name, 'urls.py')
 
-        try:
-            with open(main_urls_path, 'r+') as file:
-                existing_content = file.read()
+        # Nothing to do if the routes are unchanged and nobody edited urls.py since we wrote it
+        routes = json.dumps([self.generated_views, self.generated_routes], sort_keys=True)
+        if self.manifest is not None and self.manifest.entry_is_current('urls', routes) \
+                and self.manifest.file_matches(main_urls_path):
+            print("URL configuration is up to date.")
+            return
 
-                # Split the existing content into two parts: before and after urlpatterns
-                if "urlpatterns = [" in existing_content:
-                    parts = existing_content.split("urlpatterns = [")
-                    header = parts[0]  # Content before 'urlpatterns = ['
-                    urlpatterns_section = "urlpatterns = [" + parts[1]
-                else:
-                    header = existing_content
-                    urlpatterns_section = "urlpatterns = [\n    path('admin/', admin.site.urls),\n"
-
-                # Process the header to add necessary imports
-                import_lines = ""
-                for app_name, views in self.generated_views.items():
-                    if views:  # Check if there are any views generated for the app
-                        import_line = f"from {app_name} import views as {app_name}_views\n"
-                        if import_line not in header:  # Avoid duplicate imports
-                            import_lines += import_line
-
-                # Process the urlpatterns section to add URL patterns
-                urlpatterns_content, closing = urlpatterns_section.rsplit("]", 1)
-                for app_name, views in self.generated_views.items():
-                    for view_name in views:
-                        url_pattern = f"    path('{app_name}/{view_name}/', {app_name}_views.{view_name}, name='{app_name}_{view_name}'),\n"
-                        if url_pattern not in urlpatterns_content:  # Avoid duplicate patterns
-                            urlpatterns_content += url_pattern
-
-                # Combine the parts and write back to the file
-                final_content = import_lines + header + urlpatterns_content + "]" + closing
-                file.seek(0)
-                file.write(final_content)
-                file.truncate()
+        try:
+            editor = PythonSourceEditor(main_urls_path)
+            if not editor.has('urlpatterns'):
+                editor.add_import("from django.contrib import admin")
+                editor.add_import("from django.urls import path")
+
+            # Add view imports and URL patterns. A pattern with the same name= replaces the
+            # existing one, so a changed route does not leave the old path behind
+            url_patterns = ["path('admin/', admin.site.urls)"] if not editor.has('urlpatterns') else []
+            for app_name, views in self.generated_views.items():
+                if views:  # Check if there are any views generated for the app
+                    editor.add_import(f"from {app_name} import views as {app_name}_views")
+            for app_name, view_name, route in self.route_table():
+                url_patterns.append(f"path('{route}', {app_name}_views.{view_name}, name='{app_name}_{view_name}')")
+            editor.replace_list_items('urlpatterns', url_patterns, url_pattern_key)
+            final_content = editor.save()
+
+            if self.manifest is not None:
+                self.manifest.record(main_urls_path, final_content)
+                self.manifest.record_entry('urls', routes)
+                self.manifest.save()
 
         except Exception as e:
-            print(f"Error updating URLs: {e}")  # Error handling
-        
-def main():
-    project_name = "taskforce"
-    apps = ["auth_app", "task_manager", "project_manager", "health_tracker", 
-            "mind_wellness", "time_tracker", "seo_tools", "communication", 
-            "data_analysis", "shop_manager", "payment_processor", 
-            "custom_software_dev", "lifestyle_consultancy", "user_groups_management", 
-            "project_export_import", "project_title_level_system", 
-            "priority_table_management"]
-
-    setup = DjangoProjectSetup(project_name, apps)
-    
-
-    # Configure database settings after the Django project setup is complete
-    # db_engine = 'django.db.backends.postgresql'
-    # db_name = 'db_name'
-    # db_user = 'db_user'
-    # db_password = 'db_password!'
-    # db_host = 'wdm-db.cihp8rwuaz6j.eu-north-1.rds.amazonaws.com < reccomended'
-    # db_port = '5432'
-
-    #setup.configure_settings(db_engine, db_name, db_user, db_password, db_host, db_port, apps)
-    # print("Database configuration has been updated.")
+            # Re-raised so the plan does not record the step as done
+            print(f"Error updating URLs: {e}")
+            raise
+
+def url_pattern_key(element):
+    # URL patterns are identified by their name=, unnamed ones by their source
+    for keyword in getattr(element, 'keywords', []):
+        if keyword.arg == 'name' and isinstance(keyword.value, ast.Constant):
+            return keyword.value.value
+    return ast.unparse(element)
+
+DEFAULT_PROJECT_NAME = "taskforce"
+DEFAULT_APPS = ["auth_app", "task_manager", "project_manager", "health_tracker",
+                "mind_wellness", "time_tracker", "seo_tools", "communication",
+                "data_analysis", "shop_manager", "payment_processor",
+                "custom_software_dev", "lifestyle_consultancy", "user_groups_management",
+                "project_export_import", "project_title_level_system",
+                "priority_table_management"]
+
+def default_project_spec():
+    return normalize_project_spec({'project': {'name': DEFAULT_PROJECT_NAME}, 'apps': DEFAULT_APPS})
+
+def normalize_project_spec(spec):
+    # apps may be a plain list of names or a table of per-app specs
+    apps = spec.get('apps', {})
+    if isinstance(apps, list):
+        apps = {app: {} for app in apps}
+    if 'name' not in spec.get('project', {}):
+        raise ValueError("The project spec needs a [project] table with a name.")
+    return {'project': dict(spec['project']), 'apps': {app: dict(app_spec or {}) for app, app_spec in apps.items()}}
+
+def read_spec_file(spec_path):
+    if spec_path.endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            print("PyYAML is required for YAML project specs (pip install pyyaml), or use TOML.")
+            sys.exit(1)
+        with open(spec_path, 'r') as file:
+            spec = yaml.safe_load(file)
+    else:
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                print("tomli is required for TOML project specs before Python 3.11 (pip install tomli).")
+                sys.exit(1)
+        with open(spec_path, 'rb') as file:
+            spec = tomllib.load(file)
+    return spec
+
+def load_project_spec(spec_path):
+    return normalize_project_spec(read_spec_file(spec_path))
+
+def load_batch_specs(spec_paths):
+    # Each file is either one project spec or a [[projects]] array of them
+    specs = []
+    for spec_path in spec_paths:
+        spec = read_spec_file(spec_path)
+        specs += [normalize_project_spec(project) for project in spec.get('projects', [spec])]
+    names = [spec['project']['name'] for spec in specs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Batch specs name the same project more than once: {', '.join(duplicates)}")
+    return specs
+
+class GenerationPlan:
+    # Generation steps as a dependency graph. Each node's inputs are fingerprinted into
+    # the manifest; a node runs only if its inputs changed or one of its dependencies ran,
+    # so an unchanged spec evaluates nothing. A node whose action only queues work for a
+    # later node names it in recorded_by, and is recorded once that node has succeeded.
+    def __init__(self, manifest=None):
+        self.manifest = manifest
+        self.nodes = {}
+
+    def add(self, key, inputs, action, deps=(), recorded_by=None):
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Plan node {key} depends on unknown nodes: {', '.join(missing)}")
+        self.nodes[key] = (json.dumps(inputs, sort_keys=True, default=repr), action, list(deps), recorded_by)
+
+    def execute(self, force=False):
+        # Nodes are added after their dependencies, so insertion order is a topological order
+        evaluated = []
+        deferred = {}
+        try:
+            for key, (inputs, action, deps, recorded_by) in self.nodes.items():
+                changed = force or self.manifest is None or not self.manifest.entry_is_current(f'plan:{key}', inputs)
+                if not changed and not any(dep in evaluated for dep in deps):
+                    continue
+                with TRACER.span(f'plan:{key}'):
+                    action()
+                evaluated.append(key)
+                if recorded_by is not None:
+                    deferred.setdefault(recorded_by, []).append((key, inputs))
+                elif self.manifest is not None:
+                    self.manifest.record_entry(f'plan:{key}', inputs)
+                    for deferred_key, deferred_inputs in deferred.pop(key, []):
+                        self.manifest.record_entry(f'plan:{deferred_key}', deferred_inputs)
+        finally:
+            # Steps that completed before a failure stay recorded
+            if self.manifest is not None:
+                self.manifest.save()
+        skipped = len(self.nodes) - len(evaluated)
+        print(f"Generation plan: {len(evaluated)} step(s) evaluated, {skipped} unchanged.")
+        return evaluated
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scaffold a Django project with its apps.")
+    parser.add_argument('--spec', default=None,
+                        help="TOML or YAML project spec (apps, models, views, templates, routes)")
+    parser.add_argument('--force', action='store_true',
+                        help="evaluate every generation step even if its inputs are unchanged")
+    parser.add_argument('--app-mode', choices=['inprocess', 'subprocess'], default='inprocess',
+                        help="generate apps in one interpreter or with one django-admin call per app")
+    parser.add_argument('--app-workers', type=int, default=1,
+                        help="number of processes used by the in-process app generator")
+    parser.add_argument('--cache-dir', default=None,
+                        help=f"location of the shared wheel cache (default: {DEFAULT_CACHE_ROOT})")
+    parser.add_argument('--no-wheel-cache', action='store_true',
+                        help="install requirements from the network on every run")
+    parser.add_argument('--no-write-plan', action='store_true',
+                        help="write every generated fragment immediately instead of once per file "
+                             "(needs --no-manifest, the manifest tracks whole files)")
+    parser.add_argument('--atomic-writes', action='store_true',
+                        help="write generated files through a temp file and rename")
+    parser.add_argument('--no-manifest', action='store_true',
+                        help="do not track generated files; re-runs append generated code again")
+    parser.add_argument('--db', choices=['sqlite', 'postgres'], default='sqlite',
+                        help="database profile written to settings.py")
+    parser.add_argument('--db-name', default='')
+    parser.add_argument('--db-user', default='')
+    parser.add_argument('--db-host', default='localhost')
+    parser.add_argument('--db-port', default='5432')
+    parser.add_argument('--db-driver', choices=['psycopg', 'psycopg2'], default='psycopg')
+    parser.add_argument('--db-pool', action='store_true', help="use psycopg 3's connection pool")
+    parser.add_argument('--db-replica', action='append', default=[],
+                        help="read replica host (repeatable); with sqlite, the number of stand-in aliases")
+    parser.add_argument('--conn-max-age', type=int, default=600)
+    parser.add_argument('--pgbouncer', action='store_true',
+                        help="generate settings compatible with pgbouncer transaction pooling")
+    parser.add_argument('--no-server-side-cursors', action='store_true')
+    parser.add_argument('--cache', choices=['none', 'locmem', 'file', 'redis'], default='none',
+                        help="generate a CACHES setting, cached views and per-app cache helpers")
+    parser.add_argument('--cache-timeout', type=int, default=300)
+    parser.add_argument('--asgi', action='store_true',
+                        help="generate async views and launch a multi-worker uvicorn server")
+    parser.add_argument('--asgi-workers', type=int, default=None,
+                        help="uvicorn worker processes (default: WEB_CONCURRENCY or the CPU count)")
+    parser.add_argument('--squash-migrations', action='store_true',
+                        help="squash the migrations of apps whose migrations were never applied")
+    parser.add_argument('--template-engine', choices=['auto', 'jinja2', 'simple'], default='auto',
+                        help="engine for scaffold templates (auto uses Jinja2 when installed)")
+    parser.add_argument('--theme-dir', default=None,
+                        help="directory of scaffold templates overriding the built-in ones, e.g. base.html")
+    parser.add_argument('--vendor-static', action='store_true',
+                        help="serve Bootstrap from the project with hashed, cacheable static files")
+    parser.add_argument('--whitenoise', action='store_true',
+                        help="serve static files with WhiteNoise, pre-compressed (implies --vendor-static)")
+    parser.add_argument('--static-source', default=None,
+                        help="local directory of vendor assets for offline networks")
+    parser.add_argument('--session-engine', choices=list(AuthProfile.SESSION_ENGINES), default='db',
+                        help="session storage; cache and signed_cookies avoid a DB write per login")
+    parser.add_argument('--password-hashers', choices=[profile for profile in AuthProfile.HASHER_PROFILES
+                                                       if profile != 'fast'], default='default',
+                        help="preferred password hasher, with the others kept to verify existing hashes")
+    parser.add_argument('--test-settings', action='store_true',
+                        help="write <project>/test_settings.py with a fast password hasher for test runs")
+    parser.add_argument('--login-attempts', type=int, default=0,
+                        help="failed logins per address or username before login answers 429 (0 disables)")
+    parser.add_argument('--login-window', type=int, default=300,
+                        help="seconds a failed login counts towards --login-attempts")
+    parser.add_argument('--crud', action='store_true',
+                        help="give apps without a spec a model and JSON list/detail/bulk/CSV export endpoints")
+    parser.add_argument('--load-test', action='store_true',
+                        help="write loadtest.py, an httpx harness that boots the project and measures every route")
+    parser.add_argument('--deploy', action='store_true',
+                        help="write gunicorn.conf.py, a multi-stage Dockerfile and pinned requirements.txt")
+    parser.add_argument('--launch', choices=['dev', 'gunicorn', 'none'], default=None,
+                        help="server started after scaffolding (default: dev on an interactive terminal, "
+                             "none otherwise; gunicorn needs --deploy)")
+    parser.add_argument('--profiling', action='store_true',
+                        help="generate request profiling middleware and a slowest_endpoints command")
+    parser.add_argument('--n-plus-one-threshold', type=int, default=5,
+                        help="identical queries in one request before the profiler warns")
+    parser.add_argument('--slow-request-ms', type=int, default=500,
+                        help="request duration before the profiler warns")
+    parser.add_argument('--projects-root', default=None,
+                        help=f"directory that holds the generated projects (default: {DEFAULT_PROJECTS_ROOT})")
+    parser.add_argument('--batch', nargs='+', default=None, metavar='SPEC',
+                        help="scaffold every project in these specs concurrently; no server is launched")
+    parser.add_argument('--batch-workers', type=int, default=None,
+                        help="worker processes for --batch (default: the CPU count, at most one per project)")
+    parser.add_argument('--trace-json', default=None,
+                        help="write per-phase spans, subprocess durations and bytes written as JSON")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="scaffold synthetic projects of several sizes and report scaling instead")
+    parser.add_argument('--benchmark-sizes', type=int, nargs='+', default=[1, 10, 100, 500],
+                        help="app counts for --benchmark")
+    parser.add_argument('--timing-report', action='store_true',
+                        help="compare in-process and per-app subprocess generation after setup")
+    args = parser.parse_args(argv)
+    if args.no_write_plan and not args.no_manifest:
+        parser.error("--no-write-plan needs --no-manifest: manifest-tracked files are always written whole")
+    return args
+
+def build_profiles(args, project_name):
+    # Turn the command line options into the profiles and the requirement list they imply
+    if args.db == 'postgres':
+        database_profile = DatabaseProfile(name=args.db_name or project_name, user=args.db_user,
+                                           host=args.db_host, port=args.db_port,
+                                           conn_max_age=args.conn_max_age, pgbouncer=args.pgbouncer,
+                                           server_side_cursors=not args.no_server_side_cursors,
+                                           replicas=args.db_replica, driver=args.db_driver, pool=args.db_pool)
+    else:
+        # --db-replica 3 asks for three stand-in aliases; a non-numeric value counts as one
+        replicas = sum(int(value) if value.isdigit() else 1 for value in args.db_replica)
+        database_profile = DatabaseProfile.sqlite(replicas=replicas)
+    cache_profile = CacheProfile(args.cache, timeout=args.cache_timeout) if args.cache != 'none' else None
+    requirements = ['django'] + database_profile.requirements()
+    if cache_profile:
+        requirements += cache_profile.requirements()
+    if args.asgi:
+        requirements.append('uvicorn')
+    static_stage = None
+    if args.vendor_static or args.whitenoise:
+        static_stage = StaticAssetStage(args.whitenoise, args.static_source, args.cache_dir)
+        requirements += static_stage.requirements()
+    if args.load_test:
+        requirements.append('httpx')
+    if args.deploy:
+        requirements += DeployProfile(args.asgi).server_requirements()
+    auth_profile = None
+    if (args.session_engine != 'db' or args.password_hashers != 'default' or args.login_attempts
+            or args.test_settings):
+        auth_profile = AuthProfile(args.session_engine, args.password_hashers, args.login_attempts,
+                                   args.login_window, args.test_settings)
+        requirements += auth_profile.requirements()
+    return database_profile, cache_profile, static_stage, auth_profile, pin_requirements(requirements)
+
+def build_generation_plan(setup, spec, args, database_profile, cache_profile, static_stage, auth_profile=None,
+                          run_django=True):
+    # run_django=False leaves out the steps that need the project's virtualenv
+    apps = list(spec['apps'])
+
+    def configure_project_settings():
+        # Configure database settings after the Django project setup is complete
+        setup.apply_database_profile(database_profile, apps, configurator.auth_app())
+        print("Database configuration has been updated.")
+        if cache_profile:
+            setup.apply_cache_profile(cache_profile)
+            print("Cache configuration has been updated.")
+        if auth_profile:
+            setup.apply_auth_profile(auth_profile)
+            print("Session and authentication settings have been updated.")
+            for warning in auth_profile.warnings(cache_profile):
+                print(f"Warning: {warning}")
+        if args.asgi:
+            setup.write_asgi_entry_point(args.asgi_workers)
+            print("ASGI entry point has been written.")
+        if static_stage and static_stage.vendored:
+            setup.apply_static_assets(static_stage)
+            print("Static asset configuration has been updated.")
 
     app_manager = AppPathManager(setup.project_full_path, setup.project_name, apps)  # Pass project_name here
-    file_generator = FileGenerator()
+    manifest = None if args.no_manifest else ScaffoldManifest(setup.project_full_path)
+    file_generator = FileGenerator(batch=not args.no_write_plan, atomic=args.atomic_writes, manifest=manifest)
     template_generator = HTMLTemplateGenerator(app_manager, file_generator)
     file_editor = AppFileEditor(app_manager, file_generator, template_generator)
-    configurator = AppFileConfigurator(setup, app_manager, file_editor)
-
+    templates = TemplateRegistry(args.theme_dir, args.template_engine,
+                                 os.path.join(args.cache_dir or DEFAULT_CACHE_ROOT, 'templates'))
+    configurator = AppFileConfigurator(setup, app_manager, file_editor, manifest, cache_profile, args.asgi,
+                                       spec['apps'], templates, auth_profile, args.crud)
+    if static_stage and static_stage.vendor(setup.project_full_path):
+        configurator.template_context = static_stage.template_context()
+
+    # Compile the spec into a plan; URL routes are known up front for every app
+    options = {'generator_version': GENERATOR_VERSION, 'cache': args.cache, 'cache_timeout': args.cache_timeout,
+               'asgi': args.asgi, 'theme': args.theme_dir, 'templates': templates.fingerprint(),
+               'static': bool(static_stage and static_stage.vendored), 'whitenoise': args.whitenoise,
+               'auth': vars(auth_profile) if auth_profile else None, 'crud': args.crud}
+    plan = GenerationPlan(manifest)
+    plan.add('settings', {'apps': apps, 'auth_app': configurator.auth_app(), 'database': vars(database_profile),
+                          'options': options},
+             configure_project_settings)
+    settings_nodes = ['settings']
+    if args.profiling:
+        profiling_profile = ProfilingProfile(args.n_plus_one_threshold, args.slow_request_ms)
+        plan.add('profiling', {'profile': vars(profiling_profile), 'options': options},
+                 functools.partial(setup.apply_profiling, profiling_profile, templates), deps=['settings'])
+        settings_nodes.append('profiling')
+    app_nodes = []
     for app in apps:
-        configurator.configure_app(app)
-
+        configurator.register_views(app)
+        # App steps only queue fragments, so they count as done once 'files' has written them
+        plan.add(f'app:{app}', {'spec': spec['apps'][app], 'options': options},
+                 functools.partial(configurator.configure_app, app), recorded_by='files')
+        app_nodes.append(f'app:{app}')
+
+    # Write everything the apps generated in a single pass
+    plan.add('files', {}, file_generator.flush, deps=app_nodes)
     # Update main urls.py for all apps and views
-    configurator.update_main_urls()
-
-    # Apply database migrations
-    configurator.apply_migrations()
+    plan.add('urls', [configurator.generated_views, configurator.generated_routes],
+             configurator.update_main_urls, deps=app_nodes)
+    if args.load_test:
+        server = 'uvicorn' if args.asgi else 'runserver'
+        plan.add('loadtest', {'routes': [configurator.generated_views, configurator.generated_routes],
+                              'server': server, 'options': options},
+                 functools.partial(configurator.write_load_test, server), deps=['urls'])
+    if run_django:
+        # Apply database migrations
+        plan.add('migrations', {'squash': args.squash_migrations},
+                 functools.partial(configurator.apply_migrations, args.squash_migrations),
+                 deps=settings_nodes + ['files'])
+        if static_stage and static_stage.vendored:
+            plan.add('collectstatic', {'assets': static_stage.asset_hashes(setup.project_full_path)},
+                     setup.collect_static, deps=settings_nodes + ['files'])
+        if args.deploy:
+            deploy_profile = DeployProfile(args.asgi, setup.requirements, bool(static_stage and static_stage.vendored))
+            plan.add('deploy', {'profile': vars(deploy_profile), 'options': options},
+                     functools.partial(setup.write_deploy_artifacts, deploy_profile, templates),
+                     deps=settings_nodes + ['files'])
+    return plan
+
+def scaffold_project(spec, args, shared_env=None, app_mode=None):
+    project_name = spec['project']['name']
+    apps = list(spec['apps'])
+    database_profile, cache_profile, static_stage, auth_profile, requirements = build_profiles(args, project_name)
+
+    setup = DjangoProjectSetup(project_name, apps, app_mode or args.app_mode, args.app_workers,
+                               requirements=requirements, cache_root=args.cache_dir,
+                               use_wheel_cache=not args.no_wheel_cache, projects_root=args.projects_root,
+                               shared_env=shared_env)
+
+    if args.timing_report:
+        compare_app_generation(setup.env_path, project_name, apps, args.app_workers)
+
+    plan = build_generation_plan(setup, spec, args, database_profile, cache_profile, static_stage, auth_profile)
+    plan.execute(force=args.force)
 
     print(f"Django project '{project_name}' created successfully at {setup.project_full_path}")
+    return setup
+
+@contextlib.contextmanager
+def redirect_output(log_file):
+    # Point the process-level stdout/stderr at the log so subprocess output lands there too
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = [os.dup(1), os.dup(2)]
+    os.dup2(log_file.fileno(), 1)
+    os.dup2(log_file.fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved_fds[0], 1)
+        os.dup2(saved_fds[1], 2)
+        for fd in saved_fds:
+            os.close(fd)
+
+def init_batch_worker():
+    # Workers run the shared environment's interpreter, but spawn hands them the parent's
+    # sys.path; put the environment's site-packages first, then import Django once up front
+    import site
+    sys.path[:0] = [path for path in site.getsitepackages() if path not in sys.path]
+    import django.core.management  # noqa: F401
+
+def scaffold_batch_project(spec, args, shared_env, log_path):
+    # Runs in a pool worker. Failures are reported back rather than raised, so one broken
+    # spec does not take the rest of the batch down with it.
+    global TRACER
+    TRACER = ScaffoldTracer()
+    started = time.perf_counter()
+    result = {'project': spec['project']['name'], 'status': 'ok', 'path': None, 'error': None, 'log': log_path}
+    with open(log_path, 'w') as log_file, redirect_output(log_file):
+        try:
+            setup = scaffold_project(spec, args, shared_env, app_mode='resident')
+            result['path'] = setup.project_full_path
+        except (Exception, SystemExit) as e:
+            traceback.print_exc()
+            result.update(status='failed', error=f'{type(e).__name__}: {e}')
+    result['duration'] = round(time.perf_counter() - started, 3)
+    result['trace'] = TRACER.summary()
+    return result
+
+def run_batch(specs, args):
+    started = time.perf_counter()
+    # Profiles only depend on the options, so every project shares one requirement set
+    requirements = build_profiles(args, specs[0]['project']['name'])[-1]
+    shared_env = SharedEnvironment(requirements, args.cache_dir, not args.no_wheel_cache)
+    with TRACER.span('shared_env'):
+        shared_env.ensure()
+
+    log_dir = os.path.join(args.projects_root or DEFAULT_PROJECTS_ROOT, '.batch_logs')
+    os.makedirs(log_dir, exist_ok=True)
+    workers = max(1, min(args.batch_workers or os.cpu_count() or 1, len(specs)))
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(shared_env.python)
+    print(f"Scaffolding {len(specs)} project(s) with {workers} worker(s)...")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_batch_worker) as pool:
+        futures = {}
+        for spec in specs:
+            project_name = spec['project']['name']
+            log_path = os.path.join(log_dir, f'{project_name}.log')
+            futures[pool.submit(scaffold_batch_project, spec, args, shared_env.env_path, log_path)] = (project_name, log_path)
+        for future in as_completed(futures):
+            project_name, log_path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died; the pool reports it here
+                result = {'project': project_name, 'status': 'failed', 'path': None,
+                          'error': f'{type(e).__name__}: {e}', 'log': log_path, 'duration': None}
+            print(f"  {result['project']}: {result['status']}")
+            results.append(result)
+
+    results.sort(key=lambda result: result['project'])
+    failed = [result for result in results if result['status'] != 'ok']
+    print(f"\nBatch finished in {time.perf_counter() - started:.2f}s: "
+          f"{len(results) - len(failed)} succeeded, {len(failed)} failed.")
+    for result in results:
+        duration = f"{result['duration']:.2f}s" if result['duration'] is not None else '-'
+        print(f"  {result['project']:<30} {result['status']:<7} {duration:>8}  {result['path'] or result['error']}")
+    for result in failed:
+        print(f"See {result['log']} for the {result['project']} failure.")
+    return results
+
+# Minimal stand-ins for the startproject output, used by the benchmark so it measures
+# the generator itself without a virtualenv or Django install
+BENCHMARK_SETTINGS_STUB = """from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    }
+}
+
+STATIC_URL = 'static/'
+"""
+
+BENCHMARK_URLS_STUB = """from django.contrib import admin
+from django.urls import path
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+]
+"""
+
+def synthetic_project_spec(app_count):
+    apps = {'auth_app': {'kind': 'auth'}}
+    for index in range(1, app_count):
+        app = f'app_{index:03d}'
+        apps[app] = {
+            'models': [{
+                'name': 'Item',
+                'fields': [
+                    {'name': 'name', 'type': 'CharField', 'max_length': 100},
+                    {'name': 'created_at', 'type': 'DateTimeField', 'auto_now_add': True},
+                ],
+                'indexes': [['name'], ['-created_at']],
+                'str_field': 'name',
+            }],
+            'views': {'index': f'{app}/index.html', 'detail': f'{app}/detail.html'},
+            'templates': {'index.html': f'<h1>{app}</h1>\n', 'detail.html': f'<h1>{app} detail</h1>\n'},
+        }
+    return normalize_project_spec({'project': {'name': 'benchproject'}, 'apps': apps})
+
+def create_synthetic_project(project_path, spec):
+    project_name = spec['project']['name']
+    os.makedirs(os.path.join(project_path, project_name))
+    with open(os.path.join(project_path, project_name, 'settings.py'), 'w') as file:
+        file.write(BENCHMARK_SETTINGS_STUB)
+    with open(os.path.join(project_path, project_name, 'urls.py'), 'w') as file:
+        file.write(BENCHMARK_URLS_STUB)
+    for app in spec['apps']:
+        os.makedirs(os.path.join(project_path, app, 'migrations'))
+        for module in ('__init__.py', 'models.py', 'views.py', 'apps.py', os.path.join('migrations', '__init__.py')):
+            open(os.path.join(project_path, app, module), 'w').close()
+
+def run_benchmark(sizes, output_path=None):
+    # Scaffold synthetic projects of increasing size twice each: a cold run that generates
+    # everything and a no-op re-run that should find nothing to do
+    global TRACER
+    args = parse_args([])
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for app_count in sizes:
+            spec = synthetic_project_spec(app_count)
+            project_path = os.path.join(work_dir, f'apps_{app_count}')
+            create_synthetic_project(project_path, spec)
+            setup = DjangoProjectSetup.existing(spec['project']['name'], list(spec['apps']), project_path)
+            result = {'apps': app_count}
+            for run in ('cold', 'noop'):
+                TRACER = ScaffoldTracer()
+                with contextlib.redirect_stdout(None):
+                    profiles = build_profiles(args, 'benchproject')[:-1]
+                    plan = build_generation_plan(setup, spec, args, *profiles,
+                                                 run_django=False)
+                    plan.execute()
+                summary = TRACER.summary()
+                phases = {}
+                for span in summary['spans']:
+                    # Fold the per-app steps into one phase so sizes stay comparable
+                    phase = 'apps' if span['name'].startswith('plan:app:') else span['name'].split(':', 1)[-1]
+                    phases[phase] = round(phases.get(phase, 0) + span['duration'], 6)
+                result[run] = {'duration': summary['total_duration'], 'phases': phases,
+                               'bytes_written': summary['bytes_written']}
+            results.append(result)
+
+    print(f"{'apps':>6} {'cold (s)':>10} {'ms/app':>8} {'no-op (s)':>10} {'bytes':>10}  scaling")
+    previous = None
+    for result in results:
+        cold = result['cold']['duration']
+        scaling = ''
+        if previous:
+            # 1.0x means the cost per app stayed constant between sizes
+            per_app_ratio = (cold / result['apps']) / (previous['cold']['duration'] / previous['apps'])
+            scaling = f"{per_app_ratio:.2f}x per-app vs {previous['apps']}"
+        print(f"{result['apps']:>6} {cold:>10.3f} {cold / result['apps'] * 1000:>8.2f} "
+              f"{result['noop']['duration']:>10.3f} {result['cold']['bytes_written']:>10}  {scaling}")
+        previous = result
+    if output_path:
+        with open(output_path, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Benchmark results written to {output_path}")
+    return results
+
+def launch_server(setup, args):
+    # Unattended runs (CI, pipes) would leave a detached server nobody stops
+    launch = args.launch or ('dev' if sys.stdout.isatty() else 'none')
+    if launch == 'none':
+        return
+    if launch == 'gunicorn' and (os.name == 'nt' or not args.deploy):
+        print("gunicorn needs --deploy and a POSIX system, starting the development server instead.")
+        launch = 'dev'
+    server_command = 'python serve_asgi.py' if args.asgi else 'python manage.py runserver'
+    if os.name == 'nt':
+        activate_script = os.path.join(setup.project_full_path, "env", "Scripts", "activate")
+        cmd_command = f'cmd /k {activate_script} && cd {setup.project_full_path} && {server_command}'
+        subprocess.Popen(cmd_command, shell=True, creationflags=subprocess.CREATE_NEW_CONSOLE)
+        return
 
-    # Optional: Launch Django development server
+    # Elsewhere the server runs detached from this terminal and logs to server.log
+    python = get_env_python(setup.env_path)
+    if launch == 'gunicorn':
+        module = 'asgi' if args.asgi else 'wsgi'
+        command = [python, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', f'{setup.project_name}.{module}:application']
+    else:
+        command = [python] + server_command.split()[1:]
+    log_path = os.path.join(setup.project_full_path, 'server.log')
+    with open(log_path, 'a') as log_file:
+        process = subprocess.Popen(command, cwd=setup.project_full_path, stdout=log_file,
+                                   stderr=subprocess.STDOUT, start_new_session=True)
+    print(f"Server started with pid {process.pid}: {' '.join(command[1:])} (log: {log_path})")
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.benchmark:
+        run_benchmark(args.benchmark_sizes, args.trace_json)
+        return
+    if args.batch:
+        results = run_batch(load_batch_specs(args.batch), args)
+        if args.trace_json:
+            with open(args.trace_json, 'w') as file:
+                json.dump(results, file, indent=2)
+            print(f"Batch report written to {args.trace_json}")
+        if any(result['status'] != 'ok' for result in results):
+            sys.exit(1)
+        return
+
+    spec = load_project_spec(args.spec) if args.spec else default_project_spec()
+    setup = scaffold_project(spec, args)
+
+    TRACER.print_summary()
+    if args.trace_json:
+        TRACER.export_json(args.trace_json)
+        print(f"Trace written to {args.trace_json}")
+
+    # Optional: Launch the development server, or gunicorn with the generated config
     if setup is not None:
-        activate_script = os.path.join(setup.project_full_path, "env", "Scripts", "activate") if os.name == 'nt' else os.path.join(setup.project_full_path, "env", "bin", "activate")
-        cmd_command = f'cmd /k {activate_script} && cd {setup.project_full_path} && python manage.py runserver'
-        subprocess.Popen(cmd_command, shell=True, creationflags=subprocess.CREATE_NEW_CONSOLE)
+        launch_server(setup, args)
 
 if __name__ == "__main__":
     main()